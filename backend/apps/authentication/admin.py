@@ -1,14 +1,30 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
+from apps.companies.models import Company
 from .models import User, PasswordResetToken
 
 
+class BusinessSectorFilter(admin.SimpleListFilter):
+    """Filter users by company sector using the fixed sector choices"""
+    title = 'business sector'
+    parameter_name = 'business_sector'
+    
+    def lookups(self, request, model_admin):
+        return Company.SECTOR_CHOICES
+    
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(company__business_sector=self.value())
+        return queryset
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     """Custom User admin interface"""
     list_display = ['email', 'full_name', 'company', 'role', 'is_verified', 'is_active', 'created_at']
-    list_filter = ['role', 'is_verified', 'is_active', 'company__business_sector', 'created_at']
+    list_filter = ['role', 'is_verified', 'is_active', BusinessSectorFilter, 'created_at']
+    list_select_related = ('company',)
     search_fields = ['email', 'full_name', 'company__name']
     ordering = ['-created_at']
     
@@ -4,4 +4,11 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authentication'
-    verbose_name = 'Authentication'
\ No newline at end of file
+    verbose_name = 'Authentication'
+    
+    def ready(self):
+        # Build the cached password validators (CommonPasswordValidator reads
+        # its gzipped list into a set) at startup instead of on the first
+        # registration or password reset a worker handles
+        from django.contrib.auth.password_validation import get_default_password_validators
+        get_default_password_validators()
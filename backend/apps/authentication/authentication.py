@@ -0,0 +1,25 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class _CompanyUserLookup:
+    """
+    Stands in for the user model in JWTAuthentication.get_user, which looks
+    the user up with self.user_model.objects.get(...) and catches
+    self.user_model.DoesNotExist
+    """
+    def __init__(self, user_model):
+        self.objects = user_model.objects.select_related('company').defer('company__scoping_data')
+        self.DoesNotExist = user_model.DoesNotExist
+
+
+class CompanyJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that loads the user's company in the same query,
+    since almost every API view reads request.user.company. The company's
+    scoping_data JSON is deferred: only the onboarding endpoints read it,
+    and they load it on first access. Token and user checks are left to
+    the library's get_user; only the lookup queryset changes.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user_model = _CompanyUserLookup(self.user_model)
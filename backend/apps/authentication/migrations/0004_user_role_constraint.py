@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('authentication', '0003_user_email_indexes'),
+        ('companies', '0002_company_description'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('role__in', ['admin', 'manager'])), fields=['company'], name='user_mgmt_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.CheckConstraint(condition=models.Q(('role__in', ['admin', 'manager', 'contributor', 'viewer'])), name='user_role_valid'),
+        ),
+    ]
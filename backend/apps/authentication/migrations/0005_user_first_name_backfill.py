@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:20
+
+from django.db import migrations
+
+
+def backfill_first_name(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    users = User.objects.exclude(full_name='').only('id', 'full_name', 'first_name')
+    for user in users:
+        user.first_name = user.full_name.split(' ', 1)[0]
+    User.objects.bulk_update(users, ['first_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_user_role_constraint'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_first_name, migrations.RunPython.noop),
+    ]
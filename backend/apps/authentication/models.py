@@ -1,8 +1,18 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.db import models
+from django.db.models.functions import Lower
 import uuid
 
 
+class UserManager(BaseUserManager):
+    """User manager that resolves logins against the lowercased email"""
+
+    def get_by_natural_key(self, username):
+        return self.select_related('company').get(
+            **{self.model.USERNAME_FIELD: (username or '').lower()}
+        )
+
+
 class User(AbstractUser):
     """
     Custom User model that extends Django's AbstractUser
@@ -28,6 +38,8 @@ class User(AbstractUser):
         ('contributor', 'Contributor'),
         ('viewer', 'Viewer'),
     ]
+    MANAGEMENT_ROLES = frozenset({'admin', 'manager'})
+    REPORTING_ROLES = frozenset({'admin', 'manager', 'contributor'})
     role = models.CharField(
         max_length=20, 
         choices=ROLE_CHOICES, 
@@ -52,6 +64,8 @@ class User(AbstractUser):
     # User preferences
     preferences = models.JSONField(default=dict, blank=True)
     
+    objects = UserManager()
+    
     # Make email the login field
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'full_name']
@@ -60,10 +74,45 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(fields=['company', 'role']),
+            # Small partial index for "who can manage this company" lookups
+            models.Index(
+                fields=['company'],
+                condition=models.Q(role__in=['admin', 'manager']),
+                name='user_mgmt_idx'
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(role__in=['admin', 'manager', 'contributor', 'viewer']),
+                name='user_role_valid'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.full_name} ({self.email})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored company and role so the company user counters
+        # are only refreshed when membership changes, including for the
+        # company a user is moved out of
+        instance._loaded_company_id = instance.__dict__.get('company_id')
+        instance._loaded_role = instance.__dict__.get('role')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Emails are stored lowercased so login lookups hit the index
+        if self.email:
+            self.email = self.email.lower()
+        # Store the first word of full_name once instead of splitting per read
+        if self.full_name:
+            self.first_name = self.full_name.split(' ', 1)[0]
+        super().save(*args, **kwargs)
+    
     @property
     def is_company_admin(self):
         """Check if user is admin of their company"""
@@ -72,13 +121,13 @@ class User(AbstractUser):
     @property
     def can_manage_users(self):
         """Check if user can manage other users"""
-        return self.role in ['admin', 'manager']
+        return self.role in self.MANAGEMENT_ROLES
     
     def get_full_name(self):
         return self.full_name
     
     def get_short_name(self):
-        return self.full_name.split(' ')[0] if self.full_name else self.email
+        return self.first_name or self.email
 
 
 
@@ -1,24 +1,71 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
 from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
 from .models import User
 from apps.companies.models import Company
 
 
-class UserSerializer(serializers.ModelSerializer):
-    """Serializer for user data - matches frontend expectations"""
-    company_name = serializers.CharField(source='company.name', read_only=True)
-    company_id = serializers.CharField(source='company.id', read_only=True)
-    
-    class Meta:
-        model = User
-        fields = [
-            'id', 'email', 'full_name', 'role', 'company_id', 'company_name',
-            'phone_number', 'job_title', 'department', 'is_verified', 
-            'created_at', 'last_login'
-        ]
-        read_only_fields = ['id', 'created_at', 'last_login']
+# Sectors offered on the signup form, labelled from Company.SECTOR_CHOICES
+# so the two cannot drift apart
+REGISTRATION_SECTORS = (
+    'hospitality', 'construction', 'manufacturing', 'logistics',
+    'education', 'healthcare', 'retail', 'technology',
+)
+BUSINESS_SECTOR_CHOICES = tuple(
+    (key, dict(Company.SECTOR_CHOICES)[key]) for key in REGISTRATION_SECTORS
+)
+
+DEMO_INDUSTRY_CHOICES = (
+    ('hospitality', 'Hospitality & Tourism'),
+    ('construction', 'Construction & Real Estate'),
+    ('logistics', 'Logistics & Transportation'),
+    ('retail', 'Retail & Commerce'),
+    ('manufacturing', 'Manufacturing'),
+    ('other', 'Other'),
+)
+
+COMPANY_SIZE_CHOICES = tuple(Company.EMPLOYEE_SIZE_CHOICES)
+
+_DATETIME_FIELD = serializers.DateTimeField()
+
+
+def _datetime_repr(value):
+    return _DATETIME_FIELD.to_representation(value) if value else None
+
+
+def user_representation(user):
+    """
+    Plain-dict user payload shared by UserSerializer and the auth views.
+    Callers should load the user with select_related('company').
+    """
+    company = user.company if user.company_id else None
+    return {
+        'id': str(user.id),
+        'email': user.email,
+        'full_name': user.full_name,
+        'role': user.role,
+        'company_id': str(company.id) if company else None,
+        'company_name': company.name if company else None,
+        'phone_number': user.phone_number,
+        'job_title': user.job_title,
+        'department': user.department,
+        'is_verified': user.is_verified,
+        'created_at': _datetime_repr(user.created_at),
+        'last_login': _datetime_repr(user.last_login),
+    }
+
+
+class UserSerializer(serializers.Serializer):
+    """
+    Serializer for user data - matches frontend expectations.
+    Read-only and built by hand: it backs /me/ and the login/register
+    responses, so it skips ModelSerializer's per-instance field building.
+    """
+    def to_representation(self, user):
+        return user_representation(user)
 
 
 class RegisterSerializer(serializers.Serializer):
@@ -38,24 +85,13 @@ class RegisterSerializer(serializers.Serializer):
     company_name = serializers.CharField(max_length=255)
     company_description = serializers.CharField(required=False, allow_blank=True)
     main_location = serializers.CharField(max_length=255, required=False, default='Dubai, UAE')
-    business_sector = serializers.ChoiceField(choices=[
-        ('hospitality', 'Hospitality & Tourism'),
-        ('construction', 'Construction & Real Estate'),
-        ('manufacturing', 'Manufacturing'),
-        ('logistics', 'Logistics & Transportation'),
-        ('education', 'Education'),
-        ('healthcare', 'Healthcare'),
-        ('retail', 'Retail & E-commerce'),
-        ('technology', 'Technology & Software')
-    ])
+    business_sector = serializers.ChoiceField(choices=BUSINESS_SECTOR_CHOICES)
     password = serializers.CharField(write_only=True, min_length=8)
     confirm_password = serializers.CharField(write_only=True)
     
     def validate_email(self, value):
-        """Check if email already exists"""
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return value
+        """Normalize email; uniqueness is enforced by the DB index on insert"""
+        return value.lower()
     
     def validate_password(self, value):
         """Validate password strength"""
@@ -79,27 +115,73 @@ class RegisterSerializer(serializers.Serializer):
         main_location = validated_data.pop('main_location')
         business_sector = validated_data.pop('business_sector')
         
-        # Create company first
-        company = Company.objects.create(
-            name=company_name,
-            description=company_description,
-            business_sector=business_sector,
-            main_location=main_location
-        )
-        
-        # Create user
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            username=validated_data['email'],  # Use email as username
-            password=validated_data['password'],
-            full_name=validated_data['full_name'],
-            company=company,
-            role='admin',        # Default role is admin
-            department='Management',  # Default department is Management
-            is_active=True       # Ensure user is active by default
-        )
+        try:
+            # Company and user commit together so a failed user insert
+            # never leaves an orphaned company behind
+            with transaction.atomic():
+                # Create company first
+                company = Company.objects.create(
+                    name=company_name,
+                    description=company_description,
+                    business_sector=business_sector,
+                    main_location=main_location
+                )
+                
+                # Create user
+                user = User.objects.create_user(
+                    email=validated_data['email'],
+                    username=validated_data['email'],  # Use email as username
+                    password=validated_data['password'],
+                    full_name=validated_data['full_name'],
+                    company=company,
+                    role='admin',        # Default role is admin
+                    department='Management',  # Default department is Management
+                    is_active=True       # Ensure user is active by default
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({'email': ['A user with this email already exists.']})
         
         return user
+    
+    @classmethod
+    def bulk_register(cls, rows, batch_size=500):
+        """
+        Create many companies and their admin users in batched INSERTs.
+        Intended for trusted seed/demo data: rows use the same keys as the
+        signup form but skip per-row validation, and model save() and
+        signals do not run.
+        """
+        companies = []
+        users = []
+        for row in rows:
+            company = Company(
+                name=row['company_name'],
+                description=row.get('company_description', ''),
+                business_sector=row['business_sector'],
+                main_location=row.get('main_location', 'Dubai, UAE'),
+                # bulk_create skips the signals that maintain these counters
+                user_count=1,
+                admin_user_count=1
+            )
+            email = row['email'].lower()
+            companies.append(company)
+            users.append(User(
+                email=email,
+                username=email,
+                password=make_password(row['password']),
+                full_name=row['full_name'],
+                first_name=row['full_name'].split(' ', 1)[0],
+                company=company,
+                role='admin',
+                department='Management',
+                is_active=True
+            ))
+        
+        with transaction.atomic():
+            Company.objects.bulk_create(companies, batch_size=batch_size)
+            User.objects.bulk_create(users, batch_size=batch_size)
+        
+        return users
 
 
 class LoginSerializer(serializers.Serializer):
@@ -149,21 +231,8 @@ class DemoRequestSerializer(serializers.Serializer):
     last_name = serializers.CharField(max_length=100)
     business_email = serializers.EmailField()
     company_name = serializers.CharField(max_length=255)
-    industry = serializers.ChoiceField(choices=[
-        ('hospitality', 'Hospitality & Tourism'),
-        ('construction', 'Construction & Real Estate'),
-        ('logistics', 'Logistics & Transportation'),
-        ('retail', 'Retail & Commerce'),
-        ('manufacturing', 'Manufacturing'),
-        ('other', 'Other')
-    ])
-    company_size = serializers.ChoiceField(choices=[
-        ('1-10', '1-10 employees'),
-        ('11-50', '11-50 employees'),
-        ('51-200', '51-200 employees'),
-        ('201-500', '201-500 employees'),
-        ('500+', '500+ employees')
-    ])
+    industry = serializers.ChoiceField(choices=DEMO_INDUSTRY_CHOICES)
+    company_size = serializers.ChoiceField(choices=COMPANY_SIZE_CHOICES)
     marketing_consent = serializers.BooleanField(default=False)
 
 
@@ -172,10 +241,8 @@ class PasswordResetSerializer(serializers.Serializer):
     email = serializers.EmailField()
     
     def validate_email(self, value):
-        """Check if user exists"""
-        if not User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("No user found with this email address.")
-        return value
+        """Normalize email; existence is not revealed to the caller"""
+        return value.lower()
 
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
@@ -1,7 +1,9 @@
-from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework import serializers, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.throttling import AnonRateThrottle
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import authenticate, login
@@ -16,72 +18,47 @@ from .models import User, PasswordResetToken
 from .serializers import (
     UserSerializer, RegisterSerializer, LoginSerializer,
     DemoRequestSerializer, PasswordResetSerializer,
-    PasswordResetConfirmSerializer, UserProfileUpdateSerializer
+    PasswordResetConfirmSerializer, UserProfileUpdateSerializer,
+    user_representation
 )
 
 logger = logging.getLogger(__name__)
 
 
+class PasswordResetRateThrottle(AnonRateThrottle):
+    """Bound anonymous password reset requests per client IP"""
+    scope = 'password_reset'
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom token view that matches frontend login expectations
     Frontend sends: { username: email, password: password }
     """
     def post(self, request, *args, **kwargs):
-        # Handle both email and username fields
-        if 'username' in request.data and 'email' not in request.data:
-            request.data['email'] = request.data['username']
+        # Handle both email and username fields without mutating request.data
+        data = request.data
+        if 'username' in data and 'email' not in data:
+            data = {'email': data.get('username'), 'password': data.get('password')}
         
-        response = super().post(request, *args, **kwargs)
+        serializer = self.get_serializer(data=data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
         
-        if response.status_code == 200:
-            # Get user for additional data
-            email = request.data.get('username') or request.data.get('email')
-            try:
-                user = User.objects.get(email=email)
-                
-                # Track user session
-                self._track_user_session(request, user)
-                
-                # Add user data to response
-                response.data['user'] = UserSerializer(user).data
-                response.data['token_type'] = 'bearer'
-                
-                logger.info(f"User {user.email} logged in successfully")
-                
-            except User.DoesNotExist:
-                pass
+        # Reuse the user SimpleJWT already authenticated instead of
+        # looking it up again by email
+        user = serializer.user
         
-        return response
-    
-    def _track_user_session(self, request, user):
-        """Track user session for security and analytics"""
-        try:
-            # Get client info
-            ip_address = self._get_client_ip(request)
-            user_agent = request.META.get('HTTP_USER_AGENT', '')
-            
-            # Create or update session
-            # UserSession.objects.update_or_create(
-            #     user=user,
-            #     ip_address=ip_address,
-            #     defaults={
-            #         'user_agent': user_agent,
-            #         'is_active': True,
-            #         'last_activity': timezone.now()
-            #     }
-            # )
-        except Exception as e:
-            logger.error(f"Error tracking user session: {e}")
-    
-    def _get_client_ip(self, request):
-        """Get client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        # Add user data to response
+        data = serializer.validated_data
+        data['user'] = UserSerializer(user).data
+        data['token_type'] = 'bearer'
+        
+        logger.info("User %s logged in successfully", user.email)
+        
+        return Response(data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -103,18 +80,21 @@ def register(request):
             refresh = RefreshToken.for_user(user)
             
             # Track registration
-            logger.info(f"New user registered: {user.email}, Company: {user.company.name}")
+            logger.info("New user registered: %s, Company: %s", user.email, user.company.name)
             
             return Response({
                 'access': str(refresh.access_token),
                 'refresh': str(refresh),
                 'token_type': 'bearer',
-                'user': UserSerializer(user).data,
+                # company was just attached by create_user, so no extra query
+                'user': user_representation(user),
                 'message': 'Registration successful'
             }, status=status.HTTP_201_CREATED)
             
+        except serializers.ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            logger.error(f"Registration error: {e}")
+            logger.error("Registration error: %s", e)
             return Response({
                 'error': 'Registration failed. Please try again.'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -141,7 +121,7 @@ def demo_request(request):
         demo_data = serializer.validated_data
         
         # Log demo request
-        logger.info(f"Demo request from: {demo_data['business_email']}, Company: {demo_data['company_name']}")
+        logger.info("Demo request from: %s, Company: %s", demo_data['business_email'], demo_data['company_name'])
         
         # For now, just return success
         # In production, integrate with CRM/email system
@@ -186,6 +166,7 @@ def update_profile(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([PasswordResetRateThrottle])
 def password_reset_request(request):
     """Request password reset"""
     serializer = PasswordResetSerializer(data=request.data)
@@ -193,22 +174,16 @@ def password_reset_request(request):
     if serializer.is_valid():
         email = serializer.validated_data['email']
         
-        try:
-            user = User.objects.get(email=email)
-            
+        user = User.objects.only('id', 'email').filter(email=email).first()
+        if user is not None:
             # In production, send email with reset link
             # For now, just return success
-            logger.info(f"Password reset requested for: {email}")
-            
-            return Response({
-                'message': 'Password reset email sent if account exists'
-            })
-            
-        except User.DoesNotExist:
-            # Don't reveal if user exists or not
-            return Response({
-                'message': 'Password reset email sent if account exists'
-            })
+            logger.info("Password reset requested for: %s", email)
+        
+        # Don't reveal if user exists or not
+        return Response({
+            'message': 'Password reset email sent if account exists'
+        })
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -238,14 +213,14 @@ def logout(request):
     try:
         # Check if user exists (for demo mode compatibility)
         if hasattr(request, 'user') and request.user:
-            logger.info(f"User {getattr(request.user, 'email', 'demo-user')} logged out")
+            logger.info("User %s logged out", getattr(request.user, 'email', 'demo-user'))
         
         return Response({
             'message': 'Logged out successfully'
         })
         
     except Exception as e:
-        logger.error(f"Logout error: {e}")
+        logger.error("Logout error: %s", e)
         return Response({
             'message': 'Logged out successfully'  # Always return success for logout
         })
@@ -284,6 +259,8 @@ def get_csrf_token(request):
     """
     Provide CSRF token for frontend applications
     """
+    # A freshly masked token per response (BREACH); get_token reuses the
+    # secret from an existing csrftoken cookie instead of minting a new one
     token = get_token(request)
     return Response({
         'csrfToken': token,
@@ -50,12 +50,12 @@ class CompanyAdmin(admin.ModelAdmin):
     
     def total_users(self, obj):
         """Display total number of users"""
-        count = obj.users.count()
         return format_html(
             '<a href="/admin/authentication/user/?company__id__exact={}">{}</a>',
-            obj.id, count
+            obj.id, obj.user_count
         )
     total_users.short_description = 'Users'
+    total_users.admin_order_field = 'user_count'
 
 
 @admin.register(Location)
@@ -156,6 +156,7 @@ class CompanyInvitationAdmin(admin.ModelAdmin):
         'invited_by', 'created_at', 'expires_at'
     ]
     list_filter = ['status', 'role', 'created_at', 'expires_at']
+    list_select_related = ('company', 'invited_by', 'accepted_by')
     search_fields = ['email', 'company__name', 'invited_by__email']
     ordering = ['-created_at']
     readonly_fields = ['id', 'token', 'created_at', 'updated_at']
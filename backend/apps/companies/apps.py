@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class CompaniesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.companies'
-    verbose_name = 'Companies'
\ No newline at end of file
+    verbose_name = 'Companies'
+    
+    def ready(self):
+        import apps.companies.signals
@@ -0,0 +1,14 @@
+"""
+Management command to expire overdue company invitations
+"""
+
+from django.core.management.base import BaseCommand
+from apps.companies.models import CompanyInvitation
+
+
+class Command(BaseCommand):
+    help = 'Mark pending company invitations past their expiry date as expired'
+
+    def handle(self, *args, **options):
+        expired = CompanyInvitation.expire_pending()
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} invitations'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_company_description'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['onboarding_completed'], name='companies_c_onboard_4c63cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['esg_scoping_completed'], name='companies_c_esg_sco_aa1f14_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['business_sector'], name='companies_c_busines_f696c4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['emirate'], name='companies_c_emirate_713d89_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companyinvitation',
+            index=models.Index(fields=['status'], name='companies_c_status_ceb081_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:14
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_user_counts(apps, schema_editor):
+    Company = apps.get_model('companies', 'Company')
+    User = apps.get_model('authentication', 'User')
+    rows = (
+        User.objects.filter(company__isnull=False)
+        .order_by()
+        .values('company_id')
+        .annotate(total=Count('pk'), admins=Count('pk', filter=Q(role='admin')))
+    )
+    companies = [
+        Company(pk=row['company_id'], user_count=row['total'], admin_user_count=row['admins'])
+        for row in rows
+    ]
+    Company.objects.bulk_update(companies, ['user_count', 'admin_user_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_filter_indexes'),
+        ('authentication', '0005_user_first_name_backfill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='admin_user_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='user_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_user_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:19
+
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def normalize_invitation_tokens(apps, schema_editor):
+    """
+    Rewrite tokens as 32-digit UUID hex so the column cast to uuid succeeds
+    on every backend; tokens that are not UUIDs get a new random one
+    """
+    CompanyInvitation = apps.get_model('companies', 'CompanyInvitation')
+    invitations = []
+    for invitation in CompanyInvitation.objects.only('pk', 'token').iterator():
+        try:
+            token = uuid.UUID(invitation.token).hex
+        except (TypeError, ValueError):
+            token = uuid.uuid4().hex
+        if token != invitation.token:
+            invitation.token = token
+            invitations.append(invitation)
+    CompanyInvitation.objects.bulk_update(invitations, ['token'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_company_user_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='companyinvitation',
+            name='companies_c_status_ceb081_idx',
+        ),
+        migrations.RunPython(normalize_invitation_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='companyinvitation',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='companyinvitation',
+            index=models.Index(fields=['status', 'expires_at'], name='companies_c_status_b5ca17_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0005_invitation_uuid_token'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='companyinvitation',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='companyinvitation',
+            index=models.Index(fields=['company', 'email'], name='companies_c_company_ccb96b_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='companyinvitation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('company', 'email'), name='uniq_pending_invite'),
+        ),
+    ]
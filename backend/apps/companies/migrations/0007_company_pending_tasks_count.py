@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:35
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_pending_tasks_count(apps, schema_editor):
+    Company = apps.get_model('companies', 'Company')
+    Task = apps.get_model('tasks', 'Task')
+    rows = (
+        Task.objects.filter(status='todo')
+        .order_by()
+        .values('company_id')
+        .annotate(total=Count('pk'))
+    )
+    companies = [
+        Company(pk=row['company_id'], pending_tasks_count=row['total'])
+        for row in rows
+    ]
+    Company.objects.bulk_update(companies, ['pending_tasks_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0006_invitation_pending_unique'),
+        ('tasks', '0003_task_company_category_status_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='pending_tasks_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_pending_tasks_count, migrations.RunPython.noop),
+    ]
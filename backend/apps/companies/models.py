@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 import uuid
 
 
@@ -115,6 +116,14 @@ class Company(models.Model):
     total_evidence_files = models.IntegerField(default=0)
     uploaded_evidence_files = models.IntegerField(default=0)
     
+    # Denormalized user counters, maintained by apps.companies.signals
+    user_count = models.IntegerField(default=0, editable=False)
+    admin_user_count = models.IntegerField(default=0, editable=False)
+    
+    # Denormalized 'todo' task count, refreshed with the task scores
+    # (apps.tasks.utils._update_company_completion_stats)
+    pending_tasks_count = models.IntegerField(default=0, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -123,19 +132,31 @@ class Company(models.Model):
         verbose_name = 'Company'
         verbose_name_plural = 'Companies'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['onboarding_completed']),
+            models.Index(fields=['esg_scoping_completed']),
+            models.Index(fields=['business_sector']),
+            models.Index(fields=['emirate']),
+        ]
     
     def __str__(self):
         return self.name
     
     @property
     def admin_users(self):
-        """Get company admin users"""
+        """Get company admin users, reusing prefetched users when available"""
+        if 'users' in getattr(self, '_prefetched_objects_cache', {}):
+            return [user for user in self.users.all() if user.role == 'admin']
         return self.users.filter(role='admin')
     
     @property
     def total_users(self):
         """Get total number of users"""
-        return self.users.count()
+        return self.user_count
+    
+    def cache_key(self, prefix):
+        """Cache key that changes whenever the company row is touched"""
+        return f'{prefix}:{self.pk}:{self.updated_at.timestamp()}'
     
     def update_esg_scores(self):
         """Update ESG scores based on completed tasks and data"""
@@ -145,15 +166,21 @@ class Company(models.Model):
     
     def update_progress_metrics(self):
         """Update progress tracking metrics"""
+        updates = {}
+        
         # Calculate data completion
         if self.total_fields > 0:
-            self.data_completion_percentage = (self.completed_fields / self.total_fields) * 100
+            updates['data_completion_percentage'] = (self.completed_fields / self.total_fields) * 100
         
-        # Calculate evidence completion  
+        # Calculate evidence completion
         if self.total_evidence_files > 0:
-            self.evidence_completion_percentage = (self.uploaded_evidence_files / self.total_evidence_files) * 100
+            updates['evidence_completion_percentage'] = (self.uploaded_evidence_files / self.total_evidence_files) * 100
         
-        self.save()
+        if updates:
+            # Direct UPDATE: no save signals, no JSON fields written back
+            updates['updated_at'] = timezone.now()
+            type(self).objects.filter(pk=self.pk).update(**updates)
+            self.__dict__.update(updates)
 
 
 class Location(models.Model):
@@ -354,7 +381,7 @@ class CompanyInvitation(models.Model):
     )
     
     # Security
-    token = models.CharField(max_length=255, unique=True)
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     expires_at = models.DateTimeField()
     
     # Response
@@ -374,7 +401,26 @@ class CompanyInvitation(models.Model):
         verbose_name = 'Company Invitation'
         verbose_name_plural = 'Company Invitations'
         ordering = ['-created_at']
-        unique_together = ['company', 'email']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+            models.Index(fields=['company', 'email']),
+        ]
+        constraints = [
+            # Only one live invitation per address; declined/expired ones are kept as history
+            models.UniqueConstraint(
+                fields=['company', 'email'],
+                condition=models.Q(status='pending'),
+                name='uniq_pending_invite'
+            ),
+        ]
     
     def __str__(self):
-        return f"Invitation to {self.email} for {self.company.name}"
\ No newline at end of file
+        return f"Invitation to {self.email} for {self.company.name}"
+    
+    @classmethod
+    def expire_pending(cls):
+        """Mark every overdue pending invitation as expired in one UPDATE"""
+        now = timezone.now()
+        return cls.objects.filter(status='pending', expires_at__lt=now).update(
+            status='expired', updated_at=now
+        )
\ No newline at end of file
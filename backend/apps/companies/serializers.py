@@ -1,12 +1,137 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from .models import Company, Location, CompanySettings, CompanyInvitation
 
 
+# Choice lists shared by the onboarding serializers, built once at import
+SECTOR_CHOICES = tuple(Company.SECTOR_CHOICES)
+EMPLOYEE_SIZE_CHOICES = tuple(Company.EMPLOYEE_SIZE_CHOICES)
+EMIRATE_CHOICES = tuple(Company.EMIRATE_CHOICES)
+LICENSE_TYPE_CHOICES = tuple(Company.LICENSE_TYPE_CHOICES)
+
+
+_DATETIME_FIELD = serializers.DateTimeField()
+_BOOLEAN_FIELD = serializers.BooleanField()
+_INTEGER_FIELD = serializers.IntegerField()
+_FLOAT_FIELD = serializers.FloatField()
+
+
+def _field_repr(field, value):
+    return None if value is None else field.to_representation(value)
+
+
+def location_representation(location):
+    """Plain-dict LocationSerializer payload"""
+    return {
+        'id': str(location.id),
+        'name': location.name,
+        'address': location.address,
+        'emirate': location.emirate,
+        'total_floor_area': location.total_floor_area,
+        'number_of_floors': location.number_of_floors,
+        'building_type': location.building_type,
+        'ownership_type': location.ownership_type,
+        'operating_hours': location.operating_hours,
+        'number_of_employees': location.number_of_employees,
+        'has_separate_meters': location.has_separate_meters,
+        'meters_info': location.meters_info,
+        'is_primary': location.is_primary,
+        'created_at': _field_repr(_DATETIME_FIELD, location.created_at),
+    }
+
+
+def _company_category_stats(company):
+    """
+    Total and completed task counts per category, fetched with one
+    grouped query and memoized on the company instance
+    """
+    stats = getattr(company, '_esg_stats_cache', None)
+    if stats is None:
+        from apps.tasks.models import Task
+        
+        rows = (
+            Task.objects.filter(company=company)
+            .order_by()
+            .values('category')
+            .annotate(total=Count('id'), done=Count('id', filter=Q(status='completed')))
+        )
+        stats = {row['category']: (row['total'], row['done']) for row in rows}
+        company._esg_stats_cache = stats
+    return stats
+
+
+def company_category_percentage(company, category):
+    """
+    Completed-task percentage for a category, falling back to the stored
+    score. Read-only: stored scores are kept in sync by the Task
+    post_save/post_delete signals in apps.tasks.signals.
+    """
+    total, done = _company_category_stats(company).get(category, (0, 0))
+    
+    if total == 0:
+        return getattr(company, f'{category}_score') or 0.0
+    
+    return round((done / total) * 100, 1)
+
+
+def company_representation(company):
+    """
+    Plain-dict CompanySerializer payload for response-only paths, so views
+    that just wrote the company don't build a full ModelSerializer for it
+    """
+    return {
+        'id': str(company.id),
+        'name': company.name,
+        'description': company.description,
+        'business_sector': company.business_sector,
+        'employee_size': company.employee_size,
+        'main_location': company.main_location,
+        'emirate': company.emirate,
+        'license_type': company.license_type,
+        'esg_scoping_completed': _field_repr(_BOOLEAN_FIELD, company.esg_scoping_completed),
+        'onboarding_completed': _field_repr(_BOOLEAN_FIELD, company.onboarding_completed),
+        'setup_step': _field_repr(_INTEGER_FIELD, company.setup_step),
+        'scoping_data': company.scoping_data,
+        'overall_esg_score': _field_repr(_FLOAT_FIELD, company.overall_esg_score),
+        'environmental_score': _field_repr(_FLOAT_FIELD, company.environmental_score),
+        'social_score': _field_repr(_FLOAT_FIELD, company.social_score),
+        'governance_score': _field_repr(_FLOAT_FIELD, company.governance_score),
+        'data_completion_percentage': _field_repr(_FLOAT_FIELD, company.data_completion_percentage),
+        'evidence_completion_percentage': _field_repr(_FLOAT_FIELD, company.evidence_completion_percentage),
+        'total_fields': _field_repr(_INTEGER_FIELD, company.total_fields),
+        'completed_fields': _field_repr(_INTEGER_FIELD, company.completed_fields),
+        'total_evidence_files': _field_repr(_INTEGER_FIELD, company.total_evidence_files),
+        'uploaded_evidence_files': _field_repr(_INTEGER_FIELD, company.uploaded_evidence_files),
+        'locations': [location_representation(location) for location in company.locations.all()],
+        'total_users': company.user_count,
+        'admin_users_count': company.admin_user_count,
+        'environmental_percentage': company_category_percentage(company, 'environmental'),
+        'social_percentage': company_category_percentage(company, 'social'),
+        'governance_percentage': company_category_percentage(company, 'governance'),
+        'created_at': _field_repr(_DATETIME_FIELD, company.created_at),
+        'updated_at': _field_repr(_DATETIME_FIELD, company.updated_at),
+    }
+
+
+class LocationListSerializer(serializers.ListSerializer):
+    """
+    Emits location dicts directly instead of running the child serializer's
+    field machinery once per location (company payloads nest every location)
+    """
+    def to_representation(self, data):
+        locations = data.all() if hasattr(data, 'all') else data
+        return [location_representation(location) for location in locations]
+
+
 class LocationSerializer(serializers.ModelSerializer):
     """Serializer for company locations"""
     
     class Meta:
         model = Location
+        list_serializer_class = LocationListSerializer
         fields = [
             'id', 'name', 'address', 'emirate', 'total_floor_area',
             'number_of_floors', 'building_type', 'ownership_type',
@@ -22,7 +147,7 @@ class CompanySerializer(serializers.ModelSerializer):
     Includes locations and user count
     """
     locations = LocationSerializer(many=True, read_only=True)
-    total_users = serializers.IntegerField(read_only=True)
+    total_users = serializers.SerializerMethodField()
     admin_users_count = serializers.SerializerMethodField()
     
     # ESG Progress data (for dashboard)
@@ -43,68 +168,34 @@ class CompanySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'total_users']
     
+    def get_total_users(self, obj):
+        """Get total user count from the denormalized counter"""
+        return obj.user_count
+    
     def get_admin_users_count(self, obj):
-        """Get count of admin users"""
-        return obj.users.filter(role='admin').count()
+        """Get count of admin users from the denormalized counter"""
+        return obj.admin_user_count
     
     def get_environmental_percentage(self, obj):
         """Get environmental progress percentage based on actual company data"""
-        from apps.tasks.models import Task
-        
-        # Calculate based on completed environmental tasks
-        environmental_tasks = Task.objects.filter(company=obj, category='environmental')
-        total_env_tasks = environmental_tasks.count()
-        
-        if total_env_tasks == 0:
-            return obj.environmental_score or 0.0
-            
-        completed_env_tasks = environmental_tasks.filter(status='completed').count()
-        percentage = (completed_env_tasks / total_env_tasks) * 100
-        
-        # Update company score if significantly different
-        if abs(percentage - (obj.environmental_score or 0)) > 5:
-            obj.environmental_score = percentage
-            obj.save(update_fields=['environmental_score'])
-            
-        return round(percentage, 1)
+        return company_category_percentage(obj, 'environmental')
     
     def get_social_percentage(self, obj):
         """Get social progress percentage based on actual company data"""
-        from apps.tasks.models import Task
-        
-        social_tasks = Task.objects.filter(company=obj, category='social')
-        total_social_tasks = social_tasks.count()
-        
-        if total_social_tasks == 0:
-            return obj.social_score or 0.0
-            
-        completed_social_tasks = social_tasks.filter(status='completed').count()
-        percentage = (completed_social_tasks / total_social_tasks) * 100
-        
-        if abs(percentage - (obj.social_score or 0)) > 5:
-            obj.social_score = percentage
-            obj.save(update_fields=['social_score'])
-            
-        return round(percentage, 1)
+        return company_category_percentage(obj, 'social')
     
     def get_governance_percentage(self, obj):
         """Get governance progress percentage based on actual company data"""
-        from apps.tasks.models import Task
-        
-        governance_tasks = Task.objects.filter(company=obj, category='governance')
-        total_gov_tasks = governance_tasks.count()
-        
-        if total_gov_tasks == 0:
-            return obj.governance_score or 0.0
-            
-        completed_gov_tasks = governance_tasks.filter(status='completed').count()
-        percentage = (completed_gov_tasks / total_gov_tasks) * 100
-        
-        if abs(percentage - (obj.governance_score or 0)) > 5:
-            obj.governance_score = percentage
-            obj.save(update_fields=['governance_score'])
-            
-        return round(percentage, 1)
+        return company_category_percentage(obj, 'governance')
+
+
+class CompanyListSerializer(CompanySerializer):
+    """
+    Company serializer for list responses - same as CompanySerializer
+    without the potentially large scoping_data JSON
+    """
+    class Meta(CompanySerializer.Meta):
+        fields = [f for f in CompanySerializer.Meta.fields if f != 'scoping_data']
 
 
 class CompanyUpdateSerializer(serializers.ModelSerializer):
@@ -129,15 +220,15 @@ class BusinessInfoSerializer(serializers.Serializer):
     Serializer for onboard.html step 1 - Business Information
     """
     business_name = serializers.CharField(max_length=255)
-    industry = serializers.ChoiceField(choices=Company.SECTOR_CHOICES)
-    employee_count = serializers.ChoiceField(choices=Company.EMPLOYEE_SIZE_CHOICES)
+    industry = serializers.ChoiceField(choices=SECTOR_CHOICES)
+    employee_count = serializers.ChoiceField(choices=EMPLOYEE_SIZE_CHOICES)
     emirate_location = serializers.ChoiceField(
-        choices=Company.EMIRATE_CHOICES,
+        choices=EMIRATE_CHOICES,
         required=False,
         allow_blank=True
     )
     license_type = serializers.ChoiceField(
-        choices=Company.LICENSE_TYPE_CHOICES,
+        choices=LICENSE_TYPE_CHOICES,
         required=False,
         allow_blank=True
     )
@@ -150,7 +241,10 @@ class BusinessInfoSerializer(serializers.Serializer):
         company.emirate = self.validated_data.get('emirate_location')
         company.license_type = self.validated_data.get('license_type')
         company.setup_step = max(company.setup_step, 2)  # Move to step 2
-        company.save()
+        company.save(update_fields=[
+            'name', 'business_sector', 'employee_size', 'emirate',
+            'license_type', 'setup_step', 'updated_at'
+        ])
         return company
 
 
@@ -167,22 +261,18 @@ class LocationDataSerializer(serializers.Serializer):
     
     def create_locations(self, company):
         """Create locations for company"""
-        # Clear existing locations
-        company.locations.all().delete()
-        
-        # Create main location
-        main_location = Location.objects.create(
-            company=company,
-            name="Main Location",
-            address=self.validated_data['main_location'],
-            emirate=company.emirate or 'dubai',
-            is_primary=True
-        )
-        
-        # Create additional locations
-        additional_locations = []
+        # Build all locations up front so they go in as one batched INSERT
+        locations = [
+            Location(
+                company=company,
+                name="Main Location",
+                address=self.validated_data['main_location'],
+                emirate=company.emirate or 'dubai',
+                is_primary=True
+            )
+        ]
         for idx, loc_data in enumerate(self.validated_data.get('additional_locations', [])):
-            location = Location.objects.create(
+            locations.append(Location(
                 company=company,
                 name=loc_data.get('name', f'Location {idx + 2}'),
                 address=loc_data.get('address', ''),
@@ -192,14 +282,23 @@ class LocationDataSerializer(serializers.Serializer):
                 building_type=loc_data.get('building_type'),
                 ownership_type=loc_data.get('ownership_type'),
                 is_primary=False
-            )
-            additional_locations.append(location)
+            ))
         
-        # Update company step
+        with transaction.atomic():
+            # Clear existing locations; Location has no dependents or delete
+            # signals, so Django issues this as a single DELETE without
+            # loading the rows
+            Location.objects.filter(company_id=company.pk).delete()
+            Location.objects.bulk_create(locations, batch_size=500)
+            
+            # Update company step without re-saving the whole row
+            Company.objects.filter(pk=company.pk).update(
+                setup_step=Greatest('setup_step', Value(3)),
+                updated_at=timezone.now()
+            )
         company.setup_step = max(company.setup_step, 3)
-        company.save()
         
-        return [main_location] + additional_locations
+        return locations
 
 
 class CompanySettingsSerializer(serializers.ModelSerializer):
@@ -250,9 +349,10 @@ class DashboardStatsSerializer(serializers.Serializer):
     employee_satisfaction = serializers.FloatField(default=82.0)
     governance_compliance = serializers.FloatField(default=90.0)
     
-    # Trends data for charts
-    esg_trends = serializers.DictField()
-    emissions_breakdown = serializers.DictField()
+    # Trends data for charts - already JSON-ready, so emitted as-is rather
+    # than copied item by item like DictField does
+    esg_trends = serializers.JSONField()
+    emissions_breakdown = serializers.JSONField()
 
 
 class ProgressTrackerSerializer(serializers.Serializer):
@@ -273,7 +373,7 @@ class ProgressTrackerSerializer(serializers.Serializer):
     governance_progress = serializers.FloatField()
     
     # Detailed breakdown
-    category_details = serializers.DictField()
+    category_details = serializers.JSONField()
     
     # Next steps
-    next_actions = serializers.ListField()
\ No newline at end of file
+    next_actions = serializers.JSONField()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Company signals for keeping the denormalized user counters up to date
+and for invalidating cached dashboard aggregates
+"""
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Company, Location
+
+
+def refresh_company_user_counts(*company_ids):
+    """Recount users and admins for the given companies in one UPDATE"""
+    company_ids = {company_id for company_id in company_ids if company_id}
+    if not company_ids:
+        return
+    
+    from apps.authentication.models import User
+    
+    counts = (
+        User.objects.filter(company_id=OuterRef('pk'))
+        .order_by()
+        .values('company_id')
+        .annotate(
+            total=Count('pk'),
+            admins=Count('pk', filter=Q(role='admin'))
+        )
+    )
+    Company.objects.filter(pk__in=company_ids).update(
+        user_count=Coalesce(Subquery(counts.values('total'), output_field=IntegerField()), 0),
+        admin_user_count=Coalesce(Subquery(counts.values('admins'), output_field=IntegerField()), 0)
+    )
+
+
+# Saves that can change the counters; anything else (last_login on every
+# login, profile edits) leaves them alone
+USER_COUNT_FIELDS = {'company', 'company_id', 'role'}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_company_user_counts_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    """Refresh counters for the user's company, and the one they left"""
+    if update_fields is not None and not USER_COUNT_FIELDS.intersection(update_fields):
+        return
+    
+    loaded_company_id = getattr(instance, '_loaded_company_id', None)
+    role = instance.__dict__.get('role')
+    if not created and instance.company_id == loaded_company_id and role == getattr(instance, '_loaded_role', None):
+        return
+    
+    refresh_company_user_counts(instance.company_id, loaded_company_id)
+    instance._loaded_company_id = instance.company_id
+    instance._loaded_role = role
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def update_company_user_counts_on_user_delete(sender, instance, **kwargs):
+    """Refresh counters for the deleted user's company"""
+    refresh_company_user_counts(instance.company_id)
+
+
+def touch_company(**filters):
+    """Bump updated_at so cache keys built from Company.cache_key() change"""
+    Company.objects.filter(**filters).update(updated_at=timezone.now())
+
+
+# post_save only: a delete receiver would stop Django from fast-deleting a
+# company's locations in LocationDataSerializer.create_locations, which
+# bumps updated_at itself
+@receiver(post_save, sender=Location)
+def touch_company_on_location_change(sender, instance, **kwargs):
+    """Invalidate cached aggregates when a location is added or edited"""
+    touch_company(pk=instance.company_id)
+
+
+@receiver([post_save, post_delete], sender='tasks.TaskAttachment')
+def touch_company_on_attachment_change(sender, instance, **kwargs):
+    """Invalidate cached tracker data when evidence is uploaded or removed"""
+    touch_company(tasks__id=instance.task_id)
+
+
+@receiver([post_save, post_delete], sender='files.ExtractedFileData')
+def touch_company_on_extracted_data_change(sender, instance, **kwargs):
+    """Invalidate the cached dashboard overview when extraction results change"""
+    touch_company(tasks__attachments__id=instance.task_attachment_id)
@@ -2,18 +2,62 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case, Count, IntegerField, OuterRef, Q, Subquery, TextField, Value, When, prefetch_related_objects
+)
+from django.db.models.functions import Coalesce, Concat, Lower
 from django.shortcuts import get_object_or_404
 import logging
 
 from .models import Company, Location, CompanySettings, CompanyInvitation
 from .serializers import (
-    CompanySerializer, LocationSerializer, CompanyUpdateSerializer,
+    CompanySerializer, CompanyListSerializer, LocationSerializer, CompanyUpdateSerializer,
     BusinessInfoSerializer, LocationDataSerializer, CompanySettingsSerializer,
-    CompanyInvitationSerializer, DashboardStatsSerializer, ProgressTrackerSerializer
+    CompanyInvitationSerializer, DashboardStatsSerializer, ProgressTrackerSerializer,
+    company_representation
 )
 
 logger = logging.getLogger(__name__)
 
+# Lowercased "title action_required" text the tracker heuristics match against
+TRACKER_TEXT = Concat(
+    Lower('title'), Value(' '), Lower(Coalesce('action_required', Value(''))),
+    output_field=TextField()
+)
+
+# Number of evidence files a task is expected to have, evaluated in SQL.
+# Requires the tracker_text annotation above.
+EXPECTED_FILES = Case(
+    # Meter reading tasks and monthly tracking tasks (3 monthly bills)
+    When(Q(title__icontains='meter:') & Q(action_required__icontains='monthly consumption'), then=3),
+    When(Q(tracker_text__contains='track') & Q(tracker_text__contains='monthly'), then=3),
+    When(action_required__icontains='monthly consumption', then=3),
+    # Utility bills/tracking tasks (3 months of bills)
+    When(
+        Q(tracker_text__contains='bill') | Q(tracker_text__contains='invoice') | Q(tracker_text__contains='utility'),
+        then=3
+    ),
+    # Emissions monitoring (monitoring data + permits)
+    When(Q(tracker_text__contains='emissions') | Q(tracker_text__contains='air quality'), then=2),
+    # Waste management (waste tracking + disposal records)
+    When(
+        Q(tracker_text__contains='waste') & (Q(tracker_text__contains='disposal') | Q(tracker_text__contains='track')),
+        then=2
+    ),
+    # Recycling programs (process diagrams + records)
+    When(Q(tracker_text__contains='recycling') | Q(tracker_text__contains='reuse'), then=2),
+    # Wastewater treatment (treatment reports + compliance)
+    When(tracker_text__contains='wastewater', then=2),
+    # Certificates, assessments, etc.
+    default=Value(1),
+    output_field=IntegerField()
+)
+
+# Task title -> category detail key: spaces to underscores, '&' to 'and'
+TASK_KEY_TABLE = str.maketrans({' ': '_', '&': 'and'})
+
 
 class CompanyViewSet(viewsets.ModelViewSet):
     """
@@ -42,36 +86,44 @@ class CompanyViewSet(viewsets.ModelViewSet):
         """Get detailed task status for each ESG category"""
         from apps.tasks.models import Task
         
-        details = {}
+        categories = ['environmental', 'social', 'governance']
+        details = {category: {} for category in categories}
         
-        for category in ['environmental', 'social', 'governance']:
-            tasks = Task.objects.filter(company=company, category=category)
-            category_details = {}
-            
-            for task in tasks:
-                # Create a simplified key from task title
-                key = task.title.lower().replace(' ', '_').replace('&', 'and')[:20]
-                
-                # Use actual task status
-                if task.status == 'completed':
-                    status = 'complete'
-                elif task.status in ['in_progress', 'started']:
-                    status = 'in_progress'
-                else:
-                    status = 'pending'
-                    
-                category_details[key] = status
-            
-            details[category] = category_details
+        # One query for all categories, without hydrating Task instances
+        tasks = Task.objects.filter(
+            company=company, category__in=categories
+        ).values_list('category', 'title', 'status')
+        
+        for category, title, task_status in tasks:
+            # Create a simplified key from task title
+            key = title.lower().translate(TASK_KEY_TABLE)[:20]
             
+            # Use actual task status
+            if task_status == 'completed':
+                details[category][key] = 'complete'
+            elif task_status in ['in_progress', 'started']:
+                details[category][key] = 'in_progress'
+            else:
+                details[category][key] = 'pending'
+        
         return details
     
     def get_queryset(self):
         """Only return companies the user belongs to"""
         if self.request.user.company:
-            return Company.objects.filter(id=self.request.user.company.id)
+            queryset = Company.objects.filter(
+                id=self.request.user.company.id
+            ).prefetch_related('locations')
+            if self.action == 'list':
+                queryset = queryset.defer('scoping_data')
+            return queryset
         return Company.objects.none()
     
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CompanyListSerializer
+        return super().get_serializer_class()
+    
     @action(detail=False, methods=['get'])
     def me(self, request):
         """
@@ -83,7 +135,9 @@ class CompanyViewSet(viewsets.ModelViewSet):
                 'error': 'User is not associated with any company'
             }, status=status.HTTP_404_NOT_FOUND)
         
+        # Authentication already loaded the company; only its locations are missing
         company = request.user.company
+        prefetch_related_objects([company], 'locations')
         serializer = self.get_serializer(company)
         return Response(serializer.data)
     
@@ -105,7 +159,7 @@ class CompanyViewSet(viewsets.ModelViewSet):
             
             return Response({
                 'message': 'Business information updated successfully',
-                'company': CompanySerializer(company).data
+                'company': company_representation(company)
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -152,16 +206,21 @@ class CompanyViewSet(viewsets.ModelViewSet):
             company.scoping_data.update(scoping_data)
         else:
             company.scoping_data = scoping_data
+        update_fields = ['scoping_data', 'updated_at']
         
         # Update completion status if provided
         if request.data.get('esg_scoping_completed') is not None:
             company.esg_scoping_completed = request.data.get('esg_scoping_completed')
+            update_fields.append('esg_scoping_completed')
         
         if request.data.get('setup_step') is not None:
             company.setup_step = request.data.get('setup_step')
+            update_fields.append('setup_step')
             
+        generate_tasks = False
         if request.data.get('onboarding_completed') is not None:
             company.onboarding_completed = request.data.get('onboarding_completed')
+            update_fields.append('onboarding_completed')
             logger.info(f"🎯 Onboarding completion status set to: {company.onboarding_completed}")
             
             # Generate initial tasks when onboarding is completed
@@ -175,17 +234,23 @@ class CompanyViewSet(viewsets.ModelViewSet):
                     self._create_locations_from_scoping_data(company, scoping_data)
                     logger.info(f"   Created {company.locations.count()} locations")
                 
-                from apps.tasks.utils import generate_initial_tasks_for_company
-                generated_tasks = generate_initial_tasks_for_company(company, created_by=request.user)
-                logger.info(f"✅ Generated {len(generated_tasks)} initial tasks for {company.name}")
+                generate_tasks = True
         
-        company.save()
+        # Only write the columns this endpoint changes, not the whole row
+        company.save(update_fields=update_fields)
+        
+        # Queued after the save so task generation starts from the saved
+        # onboarding state
+        if generate_tasks:
+            from apps.tasks.utils import schedule_initial_task_generation
+            schedule_initial_task_generation(company, created_by=request.user)
+            logger.info(f"✅ Queued initial task generation for {company.name}")
         
         logger.info(f"ESG scoping data updated for company: {company.name}")
         
         return Response({
             'message': 'ESG scoping data updated successfully',
-            'company': CompanySerializer(company).data
+            'company': company_representation(company)
         })
     
     def _create_locations_from_scoping_data(self, company, scoping_data):
@@ -211,12 +276,16 @@ class CompanyViewSet(viewsets.ModelViewSet):
         if not isinstance(location_data, list):
             location_data = [location_data] if location_data else []
         
+        # Build every location with its meter data, then insert them in one query
+        locations = []
+        total_meters = 0
         for idx, loc_data in enumerate(location_data):
             if not loc_data:
                 continue
-                
-            # Create location with meter data
-            location = Location.objects.create(
+            meters = loc_data.get('meters') or []
+            n_meters = len(meters)
+            total_meters += n_meters
+            locations.append(Location(
                 company=company,
                 name=loc_data.get('name', f'Location {idx + 1}'),
                 address=loc_data.get('address', ''),
@@ -225,11 +294,12 @@ class CompanyViewSet(viewsets.ModelViewSet):
                 number_of_floors=int(loc_data.get('numberOfFloors', 1) or 1),
                 building_type=loc_data.get('buildingType', ''),
                 ownership_type=loc_data.get('ownershipType', ''),
-                has_separate_meters=len(loc_data.get('meters', [])) > 0,
-                meters_info=loc_data.get('meters', []),  # This preserves the frontend meter format!
+                has_separate_meters=n_meters > 0,
+                meters_info=meters,  # This preserves the frontend meter format!
                 is_primary=(idx == 0)
-            )
-            logger.info(f"   Created location: {location.name} with {len(loc_data.get('meters', []))} meters")
+            ))
+        Location.objects.bulk_create(locations, batch_size=100)
+        logger.info(f"   Created {len(locations)} locations with {total_meters} meters")
     
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
@@ -242,9 +312,18 @@ class CompanyViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
         
         company = request.user.company
-        
+        # Cache the serialized payload so hits skip DashboardStatsSerializer too
+        stats_data = cache.get_or_set(
+            company.cache_key('dash'),
+            lambda: dict(DashboardStatsSerializer(self._build_dashboard_stats(company)).data),
+            settings.DASHBOARD_STATS_CACHE_TIMEOUT
+        )
+        return Response(stats_data)
+    
+    def _build_dashboard_stats(self, company):
+        """Assemble the dash.html statistics payload for a company"""
         # Prepare dashboard data matching frontend expectations
-        stats_data = {
+        return {
             'overall_esg_score': company.overall_esg_score or 75.0,
             'environmental_score': company.environmental_score or 72.0,
             'social_score': company.social_score or 78.0,
@@ -252,7 +331,7 @@ class CompanyViewSet(viewsets.ModelViewSet):
             'data_completion': company.data_completion_percentage,
             'evidence_completion': company.evidence_completion_percentage,
             'recent_uploads': 3,  # This would be calculated from actual data
-            'pending_tasks': company.tasks.filter(status='todo').count(),
+            'pending_tasks': company.pending_tasks_count,
             'carbon_neutral_progress': 65.0,
             'employee_satisfaction': 82.0,
             'governance_compliance': 90.0,
@@ -268,9 +347,6 @@ class CompanyViewSet(viewsets.ModelViewSet):
                 'other': 10
             }
         }
-        
-        serializer = DashboardStatsSerializer(stats_data)
-        return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def progress_tracker(self, request):
@@ -284,45 +360,41 @@ class CompanyViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
         
         company = request.user.company
+        progress_data = cache.get_or_set(
+            company.cache_key('tracker'),
+            lambda: self._build_progress_data(company),
+            settings.DASHBOARD_CACHE_TIMEOUT
+        )
         
-        # Get all tasks for the company
+        serializer = ProgressTrackerSerializer(progress_data)
+        return Response(serializer.data)
+    
+    def _build_progress_data(self, company):
+        """Assemble the tracker.html progress payload for a company"""
+        # Get all tasks for the company with their attachment counts in one query.
+        # The count is a correlated subquery on the attachment task_id index, so
+        # the task rows are not joined and grouped.
         from apps.tasks.models import Task, TaskAttachment
         
-        all_tasks = Task.objects.filter(company=company)
+        attachment_counts = (
+            TaskAttachment.objects.filter(task=OuterRef('pk'))
+            .order_by()
+            .values('task')
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        all_tasks = list(
+            Task.objects.filter(company=company)
+            .annotate(tracker_text=TRACKER_TEXT)
+            .annotate(
+                uploaded=Coalesce(Subquery(attachment_counts, output_field=IntegerField()), 0),
+                expected=EXPECTED_FILES
+            )
+            .values('id', 'title', 'category', 'action_required', 'uploaded', 'expected')
+        )
         
         # Calculate file-based progress
-        total_tasks = all_tasks.count()
-        
-        # Helper function to determine expected files for a task
-        def get_expected_files(task):
-            title_lower = task.title.lower()
-            action_lower = (task.action_required or '').lower()
-            combined = f"{title_lower} {action_lower}"
-            
-            # Check for meter reading tasks (need 3 monthly bills)
-            if 'meter:' in title_lower and 'monthly consumption' in action_lower:
-                return 3  # 3 months of ADDC bills
-            # Check for monthly tracking tasks
-            elif ('track' in combined and 'monthly' in combined) or 'monthly consumption' in action_lower:
-                return 3  # 3 months of data
-            # Check for utility bills/tracking tasks
-            elif 'bill' in combined or 'invoice' in combined or 'utility' in combined:
-                return 3  # 3 months of bills
-            # Check for emissions monitoring (reports + permits)
-            elif 'emissions' in combined or 'air quality' in combined:
-                return 2  # Monitoring data + permits
-            # Check for waste management (tracking + disposal)
-            elif 'waste' in combined and ('disposal' in combined or 'track' in combined):
-                return 2  # Waste tracking + disposal records
-            # Check for recycling programs
-            elif 'recycling' in combined or 'reuse' in combined:
-                return 2  # Process diagrams + records
-            # Check for wastewater treatment
-            elif 'wastewater' in combined:
-                return 2  # Treatment reports + compliance
-            # Default to 1 file for certificates, assessments, etc.
-            else:
-                return 1
+        total_tasks = len(all_tasks)
         
         # Calculate detailed progress
         total_expected_files = 0
@@ -337,21 +409,21 @@ class CompanyViewSet(viewsets.ModelViewSet):
         
         # Process each task
         for task in all_tasks:
-            expected = get_expected_files(task)
-            uploaded = task.attachments.count()  # Count actual attachments
+            expected = task['expected']
+            uploaded = task['uploaded']
             
             total_expected_files += expected
             total_uploaded_files += uploaded
             
             # Track by category
-            category = task.category if task.category in category_progress else 'environmental'
+            category = task['category'] if task['category'] in category_progress else 'environmental'
             category_progress[category]['expected'] += expected
             category_progress[category]['uploaded'] += uploaded
             
             # Store task details for frontend
             task_detail = {
-                'id': str(task.id),
-                'title': task.title[:50] + '...' if len(task.title) > 50 else task.title,
+                'id': str(task['id']),
+                'title': task['title'][:50] + '...' if len(task['title']) > 50 else task['title'],
                 'expected': expected,
                 'uploaded': uploaded,
                 'status': 'complete' if uploaded >= expected else 'in_progress' if uploaded > 0 else 'pending'
@@ -394,15 +466,13 @@ class CompanyViewSet(viewsets.ModelViewSet):
         next_actions = []
         
         # Find tasks that need evidence
-        tasks_needing_evidence = all_tasks.filter(
-            attachments__isnull=True
-        ).distinct()[:3]
+        tasks_needing_evidence = [task for task in all_tasks if task['uploaded'] == 0][:3]
         
         for task in tasks_needing_evidence:
             next_actions.append({
                 'type': 'upload',
-                'title': f'Upload evidence for: {task.title[:30]}...',
-                'description': task.action_required or 'Upload required documentation',
+                'title': f'Upload evidence for: {task["title"][:30]}...',
+                'description': task['action_required'] or 'Upload required documentation',
                 'action': 'Upload'
             })
         
@@ -429,20 +499,15 @@ class CompanyViewSet(viewsets.ModelViewSet):
             'next_actions': next_actions
         }
         
-        # Log the calculation for debugging
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Progress Tracker Calculation for {company.name}:")
-        logger.info(f"  Total tasks: {total_tasks}")
-        logger.info(f"  Total expected files: {total_expected_files}")
-        logger.info(f"  Total uploaded files: {total_uploaded_files}")
-        logger.info(f"  Evidence percentage: {evidence_completion_pct}%")
-        logger.info(f"  Environmental: {env_pct}% ({category_progress['environmental']['uploaded']}/{category_progress['environmental']['expected']})")
-        logger.info(f"  Social: {social_pct}% ({category_progress['social']['uploaded']}/{category_progress['social']['expected']})")
-        logger.info(f"  Governance: {gov_pct}% ({category_progress['governance']['uploaded']}/{category_progress['governance']['expected']})")
+        # Debug only: %-style arguments are not formatted unless enabled
+        logger.debug(
+            "Progress tracker for %s: %s tasks, %s/%s files (%s%%), "
+            "environmental %s%%, social %s%%, governance %s%%",
+            company.name, total_tasks, total_uploaded_files, total_expected_files,
+            evidence_completion_pct, env_pct, social_pct, gov_pct
+        )
         
-        serializer = ProgressTrackerSerializer(progress_data)
-        return Response(serializer.data)
+        return progress_data
 
 
 @api_view(['GET'])
@@ -472,18 +537,17 @@ def add_location(request):
             'error': 'User is not associated with any company'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    data = request.data.copy()
-    data['company'] = request.user.company.id
-    
-    serializer = LocationSerializer(data=data)
+    serializer = LocationSerializer(data=request.data)
     if serializer.is_valid():
-        location = serializer.save()
+        # Attach the already-loaded company instance; 'company' is not a
+        # serializer field, so it has to be passed to save()
+        location = serializer.save(company=request.user.company)
         
         logger.info(f"New location added: {location.name} for company: {request.user.company.name}")
         
         return Response({
             'message': 'Location added successfully',
-            'location': LocationSerializer(location).data
+            'location': serializer.data
         }, status=status.HTTP_201_CREATED)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -541,17 +605,25 @@ def company_overview(request):
     
     company = request.user.company
     
-    # Calculate some basic statistics
-    total_tasks = company.tasks.count()
-    completed_tasks = company.tasks.filter(status='completed').count()
-    pending_tasks = company.tasks.filter(status='todo').count()
-    in_progress_tasks = company.tasks.filter(status='in_progress').count()
+    # Calculate some basic statistics in one conditional aggregate
+    task_stats = company.tasks.order_by().aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        pending=Count('id', filter=Q(status='todo')),
+        in_progress=Count('id', filter=Q(status='in_progress'))
+    )
+    total_tasks = task_stats['total']
+    completed_tasks = task_stats['completed']
+    pending_tasks = task_stats['pending']
+    in_progress_tasks = task_stats['in_progress']
+    
+    company_data = company_representation(company)
     
     overview_data = {
-        'company': CompanySerializer(company).data,
+        'company': company_data,
         'statistics': {
             'total_users': company.total_users,
-            'total_locations': company.locations.count(),
+            'total_locations': len(company_data['locations']),
             'total_tasks': total_tasks,
             'completed_tasks': completed_tasks,
             'pending_tasks': pending_tasks,
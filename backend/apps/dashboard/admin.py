@@ -1,23 +1,79 @@
 from django.contrib import admin
-from django.utils.html import format_html
-from django.urls import reverse
+from django.contrib.admin.views.main import ChangeList
+from django.forms.models import BaseInlineFormSet
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.validators import validate_ipv46_address
+from django.db import OperationalError, connections, transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Concat
+from django.utils.functional import cached_property
 from django.utils import timezone
 from .models import DashboardMetric, DashboardWidget, DashboardAlert, BenchmarkData, AnalyticsEvent
 
 
+class TimeLimitedPaginator(Paginator):
+    """
+    Paginator for large append-only tables. On PostgreSQL the COUNT(*) is
+    cut off after 200ms and a placeholder total is shown instead; other
+    backends count normally.
+    """
+    
+    @cached_property
+    def count(self):
+        db = getattr(self.object_list, 'db', 'default')
+        connection = connections[db]
+        if connection.vendor != 'postgresql':
+            return super().count
+        
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL statement_timeout TO 200;')
+            try:
+                return super().count
+            except OperationalError:
+                pass
+        return 9999999999
+
+
+class ProjectedChangeList(ChangeList):
+    """Changelist that loads only the model admin's list_only columns"""
+    
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        return queryset.only(*self.model_admin.list_only)
+
+
+class ListOnlyMixin:
+    """
+    Load only the columns the changelist renders (list_display plus what
+    the row labels read), including on select_related models; change
+    forms still load full rows
+    """
+    list_only = ()
+    
+    def get_changelist(self, request, **kwargs):
+        return ProjectedChangeList
+
+
 @admin.register(DashboardMetric)
-class DashboardMetricAdmin(admin.ModelAdmin):
+class DashboardMetricAdmin(ListOnlyMixin, admin.ModelAdmin):
     """Dashboard metric admin interface"""
     list_display = [
         'metric_name', 'company', 'metric_type', 'period_display',
         'is_current', 'calculated_at'
     ]
-    list_filter = [
-        'metric_type', 'is_current', 'calculated_at',
-        'period_start', 'period_end'
-    ]
+    list_filter = ['metric_type', 'is_current', 'calculated_at']
+    list_select_related = ('company',)
+    list_only = (
+        'metric_name', 'company__name', 'metric_type', 'is_current', 'calculated_at'
+    )
     search_fields = ['metric_name', 'company__name']
+    autocomplete_fields = ('company', 'calculated_by')
     ordering = ['-calculated_at']
+    sortable_by = ('calculated_at', 'metric_name', 'period_display')
+    paginator = TimeLimitedPaginator
+    show_full_result_count = False
+    list_per_page = 25
     readonly_fields = ['id', 'calculated_at']
     
     fieldsets = (
@@ -37,16 +93,19 @@ class DashboardMetricAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('company', 'calculated_by')
+        return super().get_queryset(request).annotate(
+            period_str=Concat('period_start', Value(' to '), 'period_end', output_field=CharField())
+        )
     
     def period_display(self, obj):
         """Display period range"""
-        return f"{obj.period_start} to {obj.period_end}"
+        return obj.period_str
     period_display.short_description = 'Period'
+    period_display.admin_order_field = 'period_start'
 
 
 @admin.register(DashboardWidget)
-class DashboardWidgetAdmin(admin.ModelAdmin):
+class DashboardWidgetAdmin(ListOnlyMixin, admin.ModelAdmin):
     """Dashboard widget admin interface"""
     list_display = [
         'title', 'company', 'widget_type', 'position_display',
@@ -56,8 +115,17 @@ class DashboardWidgetAdmin(admin.ModelAdmin):
         'widget_type', 'is_visible', 'refresh_interval_minutes',
         'created_at', 'updated_at'
     ]
+    list_select_related = ('company',)
+    list_only = (
+        'title', 'company__name', 'widget_type', 'is_visible',
+        'refresh_interval_minutes', 'last_refreshed'
+    )
     search_fields = ['title', 'description', 'company__name']
+    autocomplete_fields = ('company',)
     ordering = ['company', 'position_y', 'position_x']
+    sortable_by = ('position_display', 'title')
+    show_full_result_count = False
+    list_per_page = 50
     readonly_fields = ['id', 'last_refreshed', 'created_at', 'updated_at']
     
     fieldsets = (
@@ -80,16 +148,23 @@ class DashboardWidgetAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('company')
+        return super().get_queryset(request).annotate(
+            position_str=Concat(
+                Value('('), 'position_x', Value(', '), 'position_y', Value(') - '),
+                'width', Value('x'), 'height',
+                output_field=CharField()
+            )
+        )
     
     def position_display(self, obj):
         """Display widget position"""
-        return f"({obj.position_x}, {obj.position_y}) - {obj.width}x{obj.height}"
+        return obj.position_str
     position_display.short_description = 'Position & Size'
+    position_display.admin_order_field = 'position_y'
 
 
 @admin.register(DashboardAlert)
-class DashboardAlertAdmin(admin.ModelAdmin):
+class DashboardAlertAdmin(ListOnlyMixin, admin.ModelAdmin):
     """Dashboard alert admin interface"""
     list_display = [
         'title', 'company', 'alert_type', 'severity',
@@ -99,8 +174,18 @@ class DashboardAlertAdmin(admin.ModelAdmin):
         'alert_type', 'severity', 'is_active', 'is_read',
         'action_required', 'created_at'
     ]
+    list_select_related = ('company',)
+    list_only = (
+        'title', 'company__name', 'alert_type', 'severity',
+        'is_active', 'is_read', 'read_by', 'created_at'
+    )
     search_fields = ['title', 'message', 'company__name']
+    autocomplete_fields = ('company', 'read_by', 'related_assessment')
+    raw_id_fields = ('related_task',)
     ordering = ['-created_at']
+    sortable_by = ('created_at', 'severity')
+    show_full_result_count = False
+    list_per_page = 50
     readonly_fields = [
         'id', 'is_expired', 'created_at', 'read_at'
     ]
@@ -126,25 +211,33 @@ class DashboardAlertAdmin(admin.ModelAdmin):
     )
     
     actions = ['mark_as_read', 'mark_as_unread', 'deactivate_alerts']
+    bulk_update_batch_size = 10000
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
-            'company', 'read_by', 'related_task', 'related_assessment'
-        )
+        # Only the reader's name is shown, so fetch that column instead of the user row
+        return super().get_queryset(request).annotate(read_by_name=F('read_by__full_name'))
     
     def read_by_display(self, obj):
         """Display who read the alert"""
-        if obj.read_by:
-            return obj.read_by.full_name
+        if obj.read_by_id:
+            return obj.read_by_name
         return '-'
     read_by_display.short_description = 'Read By'
     
     def mark_as_read(self, request, queryset):
         """Mark selected alerts as read"""
-        for alert in queryset:
-            if not alert.is_read:
-                alert.mark_read(request.user)
-        self.message_user(request, f"Marked {queryset.count()} alerts as read.")
+        # Update in bounded batches so "select all" on a large table neither
+        # loads every id at once nor holds one long write transaction. Marked
+        # rows drop out of the unread selection, so each pass takes the next batch
+        unread_ids = queryset.filter(is_read=False).order_by().values_list('pk', flat=True)
+        read_at = timezone.now()
+        updated = 0
+        while batch := list(unread_ids[:self.bulk_update_batch_size]):
+            with transaction.atomic():
+                updated += DashboardAlert.objects.filter(
+                    pk__in=batch, is_read=False
+                ).update(is_read=True, read_by=request.user, read_at=read_at)
+        self.message_user(request, f"Marked {updated} alerts as read.")
     mark_as_read.short_description = "Mark selected alerts as read"
     
     def mark_as_unread(self, request, queryset):
@@ -176,7 +269,11 @@ class BenchmarkDataAdmin(admin.ModelAdmin):
     ]
     search_fields = ['benchmark_name', 'sector', 'region', 'data_source']
     ordering = ['-updated_at']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    sortable_by = ('updated_at', 'benchmark_name')
+    show_full_result_count = False
+    list_per_page = 50
+    readonly_fields = ('id', 'created_at', 'updated_at')
+    readonly_fields_existing = readonly_fields + ('sector', 'region', 'benchmark_name')
     
     fieldsets = (
         ('Benchmark Information', {
@@ -205,14 +302,13 @@ class BenchmarkDataAdmin(admin.ModelAdmin):
     
     def get_readonly_fields(self, request, obj=None):
         """Make certain fields readonly for existing objects"""
-        readonly = list(self.readonly_fields)
         if obj:  # Editing existing object
-            readonly.extend(['sector', 'region', 'benchmark_name'])
-        return readonly
+            return self.readonly_fields_existing
+        return self.readonly_fields
 
 
 @admin.register(AnalyticsEvent)
-class AnalyticsEventAdmin(admin.ModelAdmin):
+class AnalyticsEventAdmin(ListOnlyMixin, admin.ModelAdmin):
     """Analytics event admin interface"""
     list_display = [
         'event_type', 'company', 'user_display', 'ip_address', 'created_at'
@@ -220,11 +316,18 @@ class AnalyticsEventAdmin(admin.ModelAdmin):
     list_filter = [
         'event_type', 'created_at'
     ]
+    list_select_related = ('company', 'user')
+    list_only = ('event_type', 'company__name', 'user__full_name', 'ip_address', 'created_at')
     search_fields = [
         'company__name', 'user__full_name', 'event_type', 
         'ip_address', 'user_agent'
     ]
+    autocomplete_fields = ('company', 'user')
     ordering = ['-created_at']
+    sortable_by = ('created_at',)
+    paginator = TimeLimitedPaginator
+    show_full_result_count = False
+    list_per_page = 25
     readonly_fields = ['id', 'created_at']
     
     fieldsets = (
@@ -240,8 +343,17 @@ class AnalyticsEventAdmin(admin.ModelAdmin):
         })
     )
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('company', 'user')
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search for an IP address with an indexed exact match instead of
+        LIKE scans over every search field (including user_agent)
+        """
+        term = search_term.strip()
+        try:
+            validate_ipv46_address(term)
+        except ValidationError:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(ip_address=term), False
     
     def user_display(self, obj):
         """Display user name or anonymous"""
@@ -261,29 +373,59 @@ class AnalyticsEventAdmin(admin.ModelAdmin):
 
 # Inline admin classes for related models
 
+class RecentRowsInlineFormSet(BaseInlineFormSet):
+    """
+    Inline formset showing only the parent's most recent rows (by the model's
+    default ordering), capped at the inline's max_rows
+    """
+    max_rows = 20
+    
+    def get_queryset(self):
+        if not hasattr(self, '_capped_queryset'):
+            self._capped_queryset = super().get_queryset()[:self.max_rows]
+        return self._capped_queryset
+
+
 class DashboardMetricInline(admin.TabularInline):
     """Inline for dashboard metrics"""
     model = DashboardMetric
+    formset = RecentRowsInlineFormSet
     extra = 0
     readonly_fields = ['calculated_at']
     fields = ['metric_type', 'metric_name', 'is_current', 'calculated_at']
+    
+    def get_queryset(self, request):
+        # Each row's label (__str__) reads the company name
+        return super().get_queryset(request).select_related('company')
 
 
 class DashboardAlertInline(admin.TabularInline):
     """Inline for dashboard alerts"""
     model = DashboardAlert
+    formset = RecentRowsInlineFormSet
     extra = 0
     readonly_fields = ['created_at', 'is_expired']
     fields = ['alert_type', 'title', 'severity', 'is_active', 'is_read', 'created_at']
+    
+    def get_queryset(self, request):
+        # Each row's label (__str__) reads the company name
+        return super().get_queryset(request).select_related('company')
 
 
 class AnalyticsEventInline(admin.TabularInline):
     """Inline for analytics events"""
     model = AnalyticsEvent
+    formset = RecentRowsInlineFormSet
     extra = 0
+    max_num = 0
+    can_delete = False
     readonly_fields = ['event_type', 'created_at']
     fields = ['event_type', 'created_at']
     
+    def get_queryset(self, request):
+        # Each row's label (__str__) reads the company and user names
+        return super().get_queryset(request).select_related('company', 'user')
+    
     def has_add_permission(self, request, obj=None):
         return False
     
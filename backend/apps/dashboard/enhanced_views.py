@@ -7,20 +7,47 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.utils import timezone
 from django.db.models import Avg, Sum, Count, Q, Max, Min
 from django.core.cache import cache
 from datetime import timedelta, datetime
+import heapq
 import logging
 
 from apps.tasks.models import Task, TaskAttachment
 from apps.companies.models import Company
 from apps.dashboard.models import DashboardMetric
 from apps.reports.models import GeneratedReport
-from apps.files.models import ExtractedFileData, update_company_metrics_cache
+from apps.files.models import (
+    COMPANY_METRICS_CACHE_TIMEOUT, ExtractedFileData, update_company_metrics_cache
+)
 
 logger = logging.getLogger(__name__)
 
+# Metrics where a latest value below the oldest one counts as an improvement
+TREND_FIELDS = (
+    'energy_consumption_kwh', 'water_usage_liters', 'waste_generated_kg', 'carbon_emissions_tco2'
+)
+
+# Metrics read by calculate_esg_scores_from_extracted_data
+SCORE_FIELDS = TREND_FIELDS + (
+    'total_employees', 'training_hours', 'safety_incidents', 'employee_satisfaction_score',
+    'compliance_score', 'board_meetings'
+)
+
+# Metrics whose latest value the get_latest_* helpers report
+METRIC_FIELDS = SCORE_FIELDS + ('renewable_energy_percentage',)
+
+# Columns the overview helpers read; leaves out the extracted_json payload
+OVERVIEW_FIELDS = METRIC_FIELDS + (
+    'extraction_date', 'confidence_score',
+    'task_attachment__original_filename', 'task_attachment__task__category',
+)
+
+# Seconds a rebuild may hold the overview lock before it expires on its own
+OVERVIEW_LOCK_TIMEOUT = 30
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -36,36 +63,72 @@ def enhanced_dashboard_overview(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Get or update cached metrics
-    cache_key = f"company_metrics_{company.id}"
-    cached_metrics = cache.get(cache_key)
-    
-    if not cached_metrics:
-        cached_metrics = update_company_metrics_cache(company)
-    
-    # Get extracted data
-    extracted_data = ExtractedFileData.objects.filter(
+    return Response(_get_dashboard_overview(company))
+
+
+def _get_dashboard_overview(company):
+    """
+    Return the cached overview payload, rebuilding it on a miss. Only the
+    request that wins the cache.add lock rebuilds and stores the payload;
+    a concurrent miss re-reads the cache once and otherwise builds its own
+    copy without storing it, rather than blocking on the lock holder.
+    """
+    # Extracted data and evidence changes touch the company, which changes the key
+    cache_key = company.cache_key('overview')
+    dashboard_data = cache.get(cache_key)
+    if dashboard_data is not None:
+        return dashboard_data
+    
+    lock_key = f'{cache_key}:lock'
+    if cache.add(lock_key, 1, timeout=OVERVIEW_LOCK_TIMEOUT):
+        try:
+            dashboard_data = _build_dashboard_overview(company)
+            cache.set(cache_key, dashboard_data, settings.DASHBOARD_STATS_CACHE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return dashboard_data
+    
+    dashboard_data = cache.get(cache_key)
+    if dashboard_data is None:
+        dashboard_data = _build_dashboard_overview(company)
+    return dashboard_data
+
+
+def _build_dashboard_overview(company):
+    """Assemble the enhanced dashboard payload for a company"""
+    # Get extracted data, oldest first, in one query shared by every helper below
+    records = list(ExtractedFileData.objects.filter(
         task_attachment__task__company=company,
         processing_status='completed'
-    )
+    ).select_related('task_attachment__task').only(*OVERVIEW_FIELDS).order_by('extraction_date'))
+    
+    # Get or update cached metrics (only the overview lock holder gets here on a
+    # miss); nothing extracted yet means nothing to aggregate
+    cached_metrics = cache.get_or_set(
+        f"company_metrics_{company.id}",
+        lambda: update_company_metrics_cache(company),
+        COMPANY_METRICS_CACHE_TIMEOUT
+    ) if records else {}
+    
+    latest = _latest_records(records)
+    
+    # Get task progress
+    task_stats = get_task_statistics(company)
     
     # Calculate ESG scores based on actual data
-    scores = calculate_esg_scores_from_extracted_data(company, extracted_data)
+    scores = calculate_esg_scores_from_extracted_data(company, records, task_stats['total'])
     
     # Get latest environmental metrics
-    env_metrics = get_latest_environmental_metrics(extracted_data)
+    env_metrics = get_latest_environmental_metrics(records, latest)
     
     # Get latest social metrics
-    social_metrics = get_latest_social_metrics(extracted_data)
+    social_metrics = get_latest_social_metrics(records, latest)
     
     # Get latest governance metrics
-    gov_metrics = get_latest_governance_metrics(extracted_data)
+    gov_metrics = get_latest_governance_metrics(latest)
     
     # Calculate trends from historical data
-    trends = calculate_trends_from_extracted_data(company, extracted_data)
-    
-    # Get task progress
-    task_stats = get_task_statistics(company)
+    trends = calculate_trends_from_extracted_data(company, records)
     
     # Build dashboard response
     dashboard_data = {
@@ -105,7 +168,7 @@ def enhanced_dashboard_overview(request):
         'emissions_breakdown': calculate_emissions_breakdown(env_metrics),
         
         # Recent activity
-        'recent_activity': get_recent_file_activity(company),
+        'recent_activity': get_recent_file_activity(records),
         
         # Data quality indicators
         'data_quality': {
@@ -116,19 +179,21 @@ def enhanced_dashboard_overview(request):
         
         # Recommendations based on data gaps
         'priority_recommendations': generate_data_driven_recommendations(
-            company, extracted_data, env_metrics, social_metrics, gov_metrics
+            company, scores['data_completion'], env_metrics, social_metrics, gov_metrics
         ),
         
         # Target progress (calculated from actual data)
         'targets_progress': calculate_target_progress(env_metrics, social_metrics, gov_metrics),
     }
     
-    return Response(dashboard_data)
+    return dashboard_data
 
 
-def calculate_esg_scores_from_extracted_data(company, extracted_data):
+def calculate_esg_scores_from_extracted_data(company, records, total_tasks=None):
     """
-    Calculate ESG scores based on extracted file data
+    Calculate ESG scores based on extracted file data (a list or an
+    evaluated queryset of ExtractedFileData). total_tasks is counted
+    when the caller does not already know it.
     """
     scores = {
         'overall': 50.0,
@@ -139,57 +204,27 @@ def calculate_esg_scores_from_extracted_data(company, extracted_data):
         'evidence_completion': 0.0,
     }
     
+    # Oldest first, so the last value of a metric is its latest one
+    records = sorted(records, key=lambda record: record.extraction_date)
+    
+    # Split the records into one column of non-null values per metric in a single pass
+    columns = {field: [] for field in SCORE_FIELDS}
+    for record in records:
+        for field, values in columns.items():
+            value = getattr(record, field)
+            if value is not None:
+                values.append(value)
+    
     # Environmental score based on data availability and values
     env_data_points = 0
     env_score_boost = 0
     
-    # Check for energy data
-    if extracted_data.exclude(energy_consumption_kwh__isnull=True).exists():
-        env_data_points += 1
-        # Check for improvement (compare latest vs oldest)
-        energy_trend = extracted_data.exclude(
-            energy_consumption_kwh__isnull=True
-        ).order_by('extraction_date')
-        if energy_trend.count() > 1:
-            first = energy_trend.first().energy_consumption_kwh
-            last = energy_trend.last().energy_consumption_kwh
-            if last < first:  # Reduction is good
-                env_score_boost += 10
-    
-    # Check for water data
-    if extracted_data.exclude(water_usage_liters__isnull=True).exists():
-        env_data_points += 1
-        water_trend = extracted_data.exclude(
-            water_usage_liters__isnull=True
-        ).order_by('extraction_date')
-        if water_trend.count() > 1:
-            first = water_trend.first().water_usage_liters
-            last = water_trend.last().water_usage_liters
-            if last < first:
-                env_score_boost += 10
-    
-    # Check for waste data
-    if extracted_data.exclude(waste_generated_kg__isnull=True).exists():
-        env_data_points += 1
-        waste_trend = extracted_data.exclude(
-            waste_generated_kg__isnull=True
-        ).order_by('extraction_date')
-        if waste_trend.count() > 1:
-            first = waste_trend.first().waste_generated_kg
-            last = waste_trend.last().waste_generated_kg
-            if last < first:
-                env_score_boost += 10
-    
-    # Check for carbon data
-    if extracted_data.exclude(carbon_emissions_tco2__isnull=True).exists():
-        env_data_points += 1
-        carbon_trend = extracted_data.exclude(
-            carbon_emissions_tco2__isnull=True
-        ).order_by('extraction_date')
-        if carbon_trend.count() > 1:
-            first = carbon_trend.first().carbon_emissions_tco2
-            last = carbon_trend.last().carbon_emissions_tco2
-            if last < first:
+    # Energy, water, waste and carbon: a latest value below the oldest is a reduction
+    for field in TREND_FIELDS:
+        values = columns[field]
+        if values:
+            env_data_points += 1
+            if len(values) > 1 and values[-1] < values[0]:
                 env_score_boost += 10
     
     # Calculate environmental score
@@ -200,33 +235,28 @@ def calculate_esg_scores_from_extracted_data(company, extracted_data):
     social_data_points = 0
     social_score_boost = 0
     
-    if extracted_data.exclude(total_employees__isnull=True).exists():
+    if columns['total_employees']:
         social_data_points += 1
     
-    if extracted_data.exclude(training_hours__isnull=True).exists():
+    training_hours = columns['training_hours']
+    if training_hours:
         social_data_points += 1
         # Higher training hours is better
-        avg_training = extracted_data.exclude(
-            training_hours__isnull=True
-        ).aggregate(avg=Avg('training_hours'))['avg']
-        if avg_training and avg_training > 20:
+        avg_training = sum(training_hours) / len(training_hours)
+        if avg_training > 20:
             social_score_boost += 10
     
-    if extracted_data.exclude(safety_incidents__isnull=True).exists():
+    safety_incidents = columns['safety_incidents']
+    if safety_incidents:
         social_data_points += 1
         # Lower incidents is better
-        latest_incidents = extracted_data.exclude(
-            safety_incidents__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_incidents and latest_incidents.safety_incidents == 0:
+        if safety_incidents[-1] == 0:
             social_score_boost += 15
     
-    if extracted_data.exclude(employee_satisfaction_score__isnull=True).exists():
+    satisfaction = columns['employee_satisfaction_score']
+    if satisfaction:
         social_data_points += 1
-        latest_satisfaction = extracted_data.exclude(
-            employee_satisfaction_score__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_satisfaction and latest_satisfaction.employee_satisfaction_score > 80:
+        if satisfaction[-1] > 80:
             social_score_boost += 10
     
     if social_data_points > 0:
@@ -236,20 +266,16 @@ def calculate_esg_scores_from_extracted_data(company, extracted_data):
     gov_data_points = 0
     gov_score_boost = 0
     
-    if extracted_data.exclude(compliance_score__isnull=True).exists():
+    compliance = columns['compliance_score']
+    if compliance:
         gov_data_points += 1
-        latest_compliance = extracted_data.exclude(
-            compliance_score__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_compliance and latest_compliance.compliance_score > 85:
+        if compliance[-1] > 85:
             gov_score_boost += 20
     
-    if extracted_data.exclude(board_meetings__isnull=True).exists():
+    board_meetings = columns['board_meetings']
+    if board_meetings:
         gov_data_points += 1
-        latest_meetings = extracted_data.exclude(
-            board_meetings__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_meetings and latest_meetings.board_meetings >= 12:
+        if board_meetings[-1] >= 12:
             gov_score_boost += 10
     
     if gov_data_points > 0:
@@ -259,30 +285,43 @@ def calculate_esg_scores_from_extracted_data(company, extracted_data):
     scores['overall'] = (scores['environmental'] + scores['social'] + scores['governance']) / 3
     
     # Data completion based on files processed
-    total_tasks = Task.objects.filter(company=company).count()
-    files_with_data = extracted_data.count()
+    if total_tasks is None:
+        total_tasks = Task.objects.filter(company=company).count()
+    files_with_data = len(records)
     
     if total_tasks > 0:
         scores['evidence_completion'] = min((files_with_data / total_tasks) * 100, 100)
     
     # Data completion based on confidence
     if files_with_data > 0:
-        avg_confidence = extracted_data.aggregate(avg=Avg('confidence_score'))['avg'] or 0
-        scores['data_completion'] = avg_confidence
+        scores['data_completion'] = sum(record.confidence_score for record in records) / files_with_data
     
     return scores
 
 
-def get_latest_environmental_metrics(extracted_data):
+def _latest_records(records):
+    """
+    Map each metric field to the newest record with a value for it,
+    in one pass from the end of records (oldest first)
+    """
+    latest = {}
+    for record in reversed(records):
+        for field in METRIC_FIELDS:
+            if field not in latest and getattr(record, field) is not None:
+                latest[field] = record
+        if len(latest) == len(METRIC_FIELDS):
+            break
+    return latest
+
+
+def get_latest_environmental_metrics(records, latest):
     """
     Get the latest environmental metrics from extracted data
     """
     metrics = {}
     
     # Energy consumption
-    energy_record = extracted_data.exclude(
-        energy_consumption_kwh__isnull=True
-    ).order_by('-extraction_date').first()
+    energy_record = latest.get('energy_consumption_kwh')
     
     if energy_record:
         metrics['energy_consumption'] = {
@@ -296,11 +335,10 @@ def get_latest_environmental_metrics(extracted_data):
         }
         
         # Get previous record for comparison
-        previous = extracted_data.exclude(
-            energy_consumption_kwh__isnull=True
-        ).exclude(
-            id=energy_record.id
-        ).order_by('-extraction_date').first()
+        previous = next((
+            record for record in reversed(records)
+            if record.energy_consumption_kwh is not None and record is not energy_record
+        ), None)
         
         if previous:
             metrics['energy_consumption']['previous_kwh'] = previous.energy_consumption_kwh
@@ -310,9 +348,7 @@ def get_latest_environmental_metrics(extracted_data):
                 metrics['energy_consumption']['reduction_percentage'] = round(reduction, 1)
     
     # Water usage
-    water_record = extracted_data.exclude(
-        water_usage_liters__isnull=True
-    ).order_by('-extraction_date').first()
+    water_record = latest.get('water_usage_liters')
     
     if water_record:
         metrics['water_usage'] = {
@@ -323,9 +359,7 @@ def get_latest_environmental_metrics(extracted_data):
         }
     
     # Waste management
-    waste_record = extracted_data.exclude(
-        waste_generated_kg__isnull=True
-    ).order_by('-extraction_date').first()
+    waste_record = latest.get('waste_generated_kg')
     
     if waste_record:
         metrics['waste_management'] = {
@@ -336,9 +370,7 @@ def get_latest_environmental_metrics(extracted_data):
         }
     
     # Carbon emissions
-    carbon_record = extracted_data.exclude(
-        carbon_emissions_tco2__isnull=True
-    ).order_by('-extraction_date').first()
+    carbon_record = latest.get('carbon_emissions_tco2')
     
     if carbon_record:
         metrics['carbon_emissions'] = {
@@ -349,9 +381,7 @@ def get_latest_environmental_metrics(extracted_data):
         }
     
     # Renewable energy
-    renewable_record = extracted_data.exclude(
-        renewable_energy_percentage__isnull=True
-    ).order_by('-extraction_date').first()
+    renewable_record = latest.get('renewable_energy_percentage')
     
     if renewable_record:
         metrics['renewable_energy'] = {
@@ -363,16 +393,14 @@ def get_latest_environmental_metrics(extracted_data):
     return metrics
 
 
-def get_latest_social_metrics(extracted_data):
+def get_latest_social_metrics(records, latest):
     """
     Get the latest social metrics from extracted data
     """
     metrics = {}
     
     # Employee metrics
-    employee_record = extracted_data.exclude(
-        total_employees__isnull=True
-    ).order_by('-extraction_date').first()
+    employee_record = latest.get('total_employees')
     
     if employee_record:
         metrics['employee_metrics'] = {
@@ -383,25 +411,21 @@ def get_latest_social_metrics(extracted_data):
         }
     
     # Training hours
-    training_records = extracted_data.exclude(
-        training_hours__isnull=True
-    )
+    training_records = [record for record in records if record.training_hours is not None]
     
-    if training_records.exists():
-        avg_training = training_records.aggregate(avg=Avg('training_hours'))['avg']
-        latest_training = training_records.order_by('-extraction_date').first()
+    if training_records:
+        avg_training = sum(record.training_hours for record in training_records) / len(training_records)
+        latest_training = latest['training_hours']
         
         metrics['training'] = {
             'average_hours': round(avg_training, 1) if avg_training else 0,
             'latest_hours': latest_training.training_hours,
             'source_file': latest_training.task_attachment.original_filename,
-            'records_count': training_records.count(),
+            'records_count': len(training_records),
         }
     
     # Safety incidents
-    safety_record = extracted_data.exclude(
-        safety_incidents__isnull=True
-    ).order_by('-extraction_date').first()
+    safety_record = latest.get('safety_incidents')
     
     if safety_record:
         metrics['health_safety'] = {
@@ -412,9 +436,7 @@ def get_latest_social_metrics(extracted_data):
         }
     
     # Employee satisfaction
-    satisfaction_record = extracted_data.exclude(
-        employee_satisfaction_score__isnull=True
-    ).order_by('-extraction_date').first()
+    satisfaction_record = latest.get('employee_satisfaction_score')
     
     if satisfaction_record:
         metrics['employee_satisfaction'] = {
@@ -426,16 +448,14 @@ def get_latest_social_metrics(extracted_data):
     return metrics
 
 
-def get_latest_governance_metrics(extracted_data):
+def get_latest_governance_metrics(latest):
     """
     Get the latest governance metrics from extracted data
     """
     metrics = {}
     
     # Compliance score
-    compliance_record = extracted_data.exclude(
-        compliance_score__isnull=True
-    ).order_by('-extraction_date').first()
+    compliance_record = latest.get('compliance_score')
     
     if compliance_record:
         metrics['compliance'] = {
@@ -446,9 +466,7 @@ def get_latest_governance_metrics(extracted_data):
         }
     
     # Board meetings
-    board_record = extracted_data.exclude(
-        board_meetings__isnull=True
-    ).order_by('-extraction_date').first()
+    board_record = latest.get('board_meetings')
     
     if board_record:
         metrics['board_structure'] = {
@@ -461,7 +479,7 @@ def get_latest_governance_metrics(extracted_data):
     return metrics
 
 
-def calculate_trends_from_extracted_data(company, extracted_data):
+def calculate_trends_from_extracted_data(company, records):
     """
     Calculate trends from historical extracted data
     """
@@ -481,27 +499,22 @@ def calculate_trends_from_extracted_data(company, extracted_data):
     # Get data from last 12 months
     twelve_months_ago = timezone.now() - timedelta(days=365)
     
-    # Group by month
-    from django.db.models.functions import TruncMonth
-    
-    monthly_data = extracted_data.filter(
-        extraction_date__gte=twelve_months_ago
-    ).annotate(
-        month=TruncMonth('extraction_date')
-    ).values('month').annotate(
-        avg_confidence=Avg('confidence_score'),
-        count=Count('id')
-    ).order_by('month')
+    # Group confidence scores by (local) month
+    monthly_data = {}
+    for record in records:
+        if record.extraction_date >= twelve_months_ago:
+            month = timezone.localtime(record.extraction_date).date().replace(day=1)
+            monthly_data.setdefault(month, []).append(record.confidence_score)
     
     # Build monthly trend data
-    for month_data in monthly_data:
-        month_str = month_data['month'].strftime('%b')
+    for month, confidences in sorted(monthly_data.items()):
+        month_str = month.strftime('%b')
         trends['monthly_trends']['months'].append(month_str)
         
         # Calculate scores for this month (simplified)
         base_score = 50
-        score_boost = min(month_data['count'] * 5, 30)  # More files = better
-        confidence_boost = (month_data['avg_confidence'] / 100) * 20
+        score_boost = min(len(confidences) * 5, 30)  # More files = better
+        confidence_boost = (sum(confidences) / len(confidences) / 100) * 20
         
         month_score = base_score + score_boost + confidence_boost
         
@@ -536,14 +549,12 @@ def get_task_statistics(company):
     """
     Get task completion statistics
     """
-    tasks = Task.objects.filter(company=company)
-    
-    return {
-        'total': tasks.count(),
-        'completed': tasks.filter(status='completed').count(),
-        'in_progress': tasks.filter(status='in_progress').count(),
-        'todo': tasks.filter(status='todo').count(),
-    }
+    return Task.objects.filter(company=company).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+        todo=Count('id', filter=Q(status='todo')),
+    )
 
 
 def calculate_emissions_breakdown(env_metrics):
@@ -579,17 +590,15 @@ def calculate_emissions_breakdown(env_metrics):
     return breakdown
 
 
-def get_recent_file_activity(company):
+def get_recent_file_activity(records):
     """
     Get recent file upload and processing activity
     """
     activities = []
     
-    # Get recent file uploads
-    recent_files = ExtractedFileData.objects.filter(
-        task_attachment__task__company=company,
-        processing_status='completed'
-    ).order_by('-extraction_date')[:10]
+    # Get the ten most recent file uploads (records are oldest first)
+    recent_files = records[:-11:-1]
+    now = timezone.now()
     
     for file_record in recent_files:
         # Determine activity type based on extracted metrics
@@ -616,7 +625,7 @@ def get_recent_file_activity(company):
         activities.append({
             'type': activity_type,
             'message': message,
-            'time': _format_time_ago(file_record.extraction_date),
+            'time': _format_time_ago(file_record.extraction_date, now),
             'icon': 'file-text' if metrics_found else 'upload',
             'category': file_record.task_attachment.task.category,
             'confidence': f"{file_record.confidence_score:.0f}%"
@@ -625,9 +634,10 @@ def get_recent_file_activity(company):
     return activities
 
 
-def generate_data_driven_recommendations(company, extracted_data, env_metrics, social_metrics, gov_metrics):
+def generate_data_driven_recommendations(company, avg_confidence, env_metrics, social_metrics, gov_metrics):
     """
-    Generate recommendations based on actual data gaps and trends
+    Generate recommendations based on actual data gaps and trends.
+    avg_confidence is the mean extraction confidence (the data_completion score).
     """
     recommendations = []
     
@@ -706,7 +716,6 @@ def generate_data_driven_recommendations(company, extracted_data, env_metrics, s
         })
     
     # Check data quality
-    avg_confidence = extracted_data.aggregate(avg=Avg('confidence_score'))['avg'] or 0
     if avg_confidence < 70:
         recommendations.append({
             'title': 'Improve Data Quality',
@@ -717,9 +726,8 @@ def generate_data_driven_recommendations(company, extracted_data, env_metrics, s
             'action_required': 'Replace low-quality scans with original digital files'
         })
     
-    # Sort by priority and return top 5
-    recommendations.sort(key=lambda x: x['priority'])
-    return recommendations[:5]
+    # Return the top 5 by priority (stable, like sorting and slicing)
+    return heapq.nsmallest(5, recommendations, key=lambda x: x['priority'])
 
 
 def calculate_target_progress(env_metrics, social_metrics, gov_metrics):
@@ -766,8 +774,8 @@ def calculate_target_progress(env_metrics, social_metrics, gov_metrics):
     return progress
 
 
-def _format_time_ago(dt):
-    """Format datetime as 'time ago' string"""
+def _format_time_ago(dt, now=None):
+    """Format datetime as 'time ago' string, relative to now (default: current time)"""
     if not dt:
         return "Unknown"
     
@@ -775,16 +783,14 @@ def _format_time_ago(dt):
     if timezone.is_naive(dt):
         dt = timezone.make_aware(dt)
     
-    now = timezone.now()
-    diff = now - dt
-    
-    if diff.days > 0:
-        return f"{diff.days} days ago"
-    elif diff.seconds > 3600:
-        hours = diff.seconds // 3600
-        return f"{hours} hours ago"
-    elif diff.seconds > 60:
-        minutes = diff.seconds // 60
-        return f"{minutes} minutes ago"
+    # Whole seconds, so timestamps slightly in the future read as "Just now"
+    seconds = int(((now or timezone.now()) - dt).total_seconds())
+    
+    if seconds >= 86400:
+        return f"{seconds // 86400} days ago"
+    elif seconds > 3600:
+        return f"{seconds // 3600} hours ago"
+    elif seconds > 60:
+        return f"{seconds // 60} minutes ago"
     else:
         return "Just now"
\ No newline at end of file
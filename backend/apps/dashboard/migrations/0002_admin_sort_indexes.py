@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_company_pending_tasks_count'),
+        ('dashboard', '0001_initial'),
+        ('esg_assessment', '0001_initial'),
+        ('tasks', '0003_task_company_category_status_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticsevent',
+            index=models.Index(fields=['created_at'], name='dashboard_a_created_599c69_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='benchmarkdata',
+            index=models.Index(fields=['updated_at'], name='dashboard_b_updated_b3d2f3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='benchmarkdata',
+            index=models.Index(fields=['benchmark_name'], name='dashboard_b_benchma_66926c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dashboardalert',
+            index=models.Index(fields=['created_at'], name='dashboard_d_created_0d737e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dashboardmetric',
+            index=models.Index(fields=['calculated_at'], name='dashboard_d_calcula_4a36c1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dashboardmetric',
+            index=models.Index(fields=['metric_name'], name='dashboard_d_metric__a39d12_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dashboardwidget',
+            index=models.Index(fields=['position_y', 'position_x'], name='dashboard_d_positio_6802e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dashboardwidget',
+            index=models.Index(fields=['title'], name='dashboard_d_title_2ddbe6_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_company_pending_tasks_count'),
+        ('dashboard', '0002_admin_sort_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticsevent',
+            index=models.Index(fields=['ip_address'], name='dashboard_a_ip_addr_3f69ae_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0007_company_pending_tasks_count'),
+        ('dashboard', '0003_analyticsevent_ip_index'),
+        ('esg_assessment', '0001_initial'),
+        ('tasks', '0003_task_company_category_status_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticsevent',
+            index=models.Index(fields=['event_type', '-created_at'], name='dashboard_a_event_t_768897_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dashboardalert',
+            index=models.Index(fields=['is_active', 'is_read', '-created_at'], name='dashboard_d_is_acti_dde893_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dashboardmetric',
+            index=models.Index(fields=['is_current', 'metric_type', '-calculated_at'], name='dashboard_d_is_curr_332c11_idx'),
+        ),
+    ]
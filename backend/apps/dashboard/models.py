@@ -53,6 +53,9 @@ class DashboardMetric(models.Model):
         indexes = [
             models.Index(fields=['company', 'metric_type', 'is_current']),
             models.Index(fields=['period_start', 'period_end']),
+            models.Index(fields=['calculated_at']),
+            models.Index(fields=['metric_name']),
+            models.Index(fields=['is_current', 'metric_type', '-calculated_at']),
         ]
     
     def __str__(self):
@@ -118,6 +121,10 @@ class DashboardWidget(models.Model):
         verbose_name_plural = 'Dashboard Widgets'
         ordering = ['position_y', 'position_x']
         unique_together = ['company', 'widget_type']
+        indexes = [
+            models.Index(fields=['position_y', 'position_x']),
+            models.Index(fields=['title']),
+        ]
     
     def __str__(self):
         return f"{self.company.name} - {self.title}"
@@ -198,6 +205,8 @@ class DashboardAlert(models.Model):
         indexes = [
             models.Index(fields=['company', 'is_active', 'is_read']),
             models.Index(fields=['severity', 'created_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['is_active', 'is_read', '-created_at']),
         ]
     
     def __str__(self):
@@ -254,6 +263,10 @@ class BenchmarkData(models.Model):
         verbose_name_plural = 'Benchmark Data'
         ordering = ['-updated_at']
         unique_together = ['sector', 'region', 'benchmark_name']
+        indexes = [
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['benchmark_name']),
+        ]
     
     def __str__(self):
         return f"{self.sector} - {self.region} - {self.benchmark_name}"
@@ -304,6 +317,9 @@ class AnalyticsEvent(models.Model):
         indexes = [
             models.Index(fields=['company', 'event_type', 'created_at']),
             models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['ip_address']),
+            models.Index(fields=['event_type', '-created_at']),
         ]
     
     def __str__(self):
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0001_initial'),
+        ('tasks', '0003_task_company_category_status_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='extractedfiledata',
+            index=models.Index(fields=['processing_status', '-extraction_date'], name='files_extra_process_a81b48_idx'),
+        ),
+    ]
@@ -67,6 +67,7 @@ class ExtractedFileData(models.Model):
         verbose_name_plural = 'Extracted File Data'
         indexes = [
             models.Index(fields=['task_attachment', 'processing_status']),
+            models.Index(fields=['processing_status', '-extraction_date']),
         ]
     
     def __str__(self):
@@ -139,6 +140,19 @@ def extract_data_from_attachment(sender, instance, created, **kwargs):
             extracted_record.save()
 
 
+# Seconds a company's aggregated extraction metrics stay cached
+COMPANY_METRICS_CACHE_TIMEOUT = 3600
+
+# Metrics whose latest non-null value is cached, by section
+LATEST_METRIC_FIELDS = {
+    'environmental': (
+        'energy_consumption_kwh', 'water_usage_liters', 'waste_generated_kg', 'carbon_emissions_tco2'
+    ),
+    'social': ('total_employees',),
+    'governance': ('compliance_score',),
+}
+
+
 def update_company_metrics_cache(company):
     """
     Update cached company metrics based on all extracted data
@@ -146,7 +160,6 @@ def update_company_metrics_cache(company):
     cache_key = f"company_metrics_{company.id}"
     
     # Aggregate all extracted data for the company
-    from django.db.models import Avg, Sum, Max, Min
     from apps.tasks.models import TaskAttachment
     
     attachments = TaskAttachment.objects.filter(
@@ -163,64 +176,32 @@ def update_company_metrics_cache(company):
         'last_updated': datetime.now().isoformat()
     }
     
-    # Get all extracted data
-    extracted_data = ExtractedFileData.objects.filter(
+    # Get all extracted data, newest first, in a single query
+    rows = list(ExtractedFileData.objects.filter(
         task_attachment__task__company=company,
         processing_status='completed'
-    )
+    ).order_by('-extraction_date').values(
+        'confidence_score', 'training_hours',
+        *(field for fields in LATEST_METRIC_FIELDS.values() for field in fields)
+    ))
     
-    if extracted_data.exists():
-        metrics['total_files_processed'] = extracted_data.count()
-        metrics['average_confidence'] = extracted_data.aggregate(
-            avg_confidence=Avg('confidence_score')
-        )['avg_confidence'] or 0.0
-        
-        # Environmental metrics (latest non-null values)
-        latest_energy = extracted_data.exclude(
-            energy_consumption_kwh__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_energy:
-            metrics['environmental']['energy_consumption_kwh'] = latest_energy.energy_consumption_kwh
-        
-        latest_water = extracted_data.exclude(
-            water_usage_liters__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_water:
-            metrics['environmental']['water_usage_liters'] = latest_water.water_usage_liters
-        
-        latest_waste = extracted_data.exclude(
-            waste_generated_kg__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_waste:
-            metrics['environmental']['waste_generated_kg'] = latest_waste.waste_generated_kg
-        
-        latest_carbon = extracted_data.exclude(
-            carbon_emissions_tco2__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_carbon:
-            metrics['environmental']['carbon_emissions_tco2'] = latest_carbon.carbon_emissions_tco2
-        
-        # Social metrics
-        latest_employees = extracted_data.exclude(
-            total_employees__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_employees:
-            metrics['social']['total_employees'] = latest_employees.total_employees
+    if rows:
+        metrics['total_files_processed'] = len(rows)
+        metrics['average_confidence'] = sum(row['confidence_score'] for row in rows) / len(rows)
         
-        avg_training = extracted_data.exclude(
-            training_hours__isnull=True
-        ).aggregate(avg_training=Avg('training_hours'))
-        if avg_training['avg_training']:
-            metrics['social']['training_hours_avg'] = avg_training['avg_training']
+        # Latest non-null value of each metric, collected in one pass
+        for row in rows:
+            for section, fields in LATEST_METRIC_FIELDS.items():
+                for field in fields:
+                    if row[field] is not None:
+                        metrics[section].setdefault(field, row[field])
         
-        # Governance metrics
-        latest_compliance = extracted_data.exclude(
-            compliance_score__isnull=True
-        ).order_by('-extraction_date').first()
-        if latest_compliance:
-            metrics['governance']['compliance_score'] = latest_compliance.compliance_score
+        training_hours = [row['training_hours'] for row in rows if row['training_hours'] is not None]
+        avg_training = sum(training_hours) / len(training_hours) if training_hours else 0
+        if avg_training:
+            metrics['social']['training_hours_avg'] = avg_training
     
     # Cache for 1 hour
-    cache.set(cache_key, metrics, 3600)
+    cache.set(cache_key, metrics, COMPANY_METRICS_CACHE_TIMEOUT)
     
     return metrics
\ No newline at end of file
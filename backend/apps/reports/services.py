@@ -774,15 +774,16 @@ class ESGDataAggregator:
         """Enhance report data with real extracted data from Universal File Parser"""
         from apps.files.models import ExtractedFileData
         
-        # Get extracted data for this company
-        extracted_data = ExtractedFileData.objects.filter(
+        # Get extracted data for this company; one query serves the count,
+        # the emptiness check and every sum below
+        extracted_data = list(ExtractedFileData.objects.filter(
             task_attachment__task__company=self.company,
             processing_status='completed'
-        ).order_by('-extraction_date')
+        ).order_by('-extraction_date'))
         
-        logger.info(f"📊 Found {extracted_data.count()} extracted file records for {self.company.name}")
+        logger.info(f"📊 Found {len(extracted_data)} extracted file records for {self.company.name}")
         
-        if not extracted_data.exists():
+        if not extracted_data:
             logger.warning(f"⚠️ No extracted data found for {self.company.name}, using basic real data")
             return real_data
         
@@ -0,0 +1,23 @@
+"""
+Django management command to recompute ESG scores for all companies
+Usage: python manage.py recalculate_esg_scores [--batch-size=N]
+"""
+
+from django.core.management.base import BaseCommand
+from apps.tasks.utils import recalculate_esg_scores_all
+
+
+class Command(BaseCommand):
+    help = 'Recompute completion and ESG scores for every company from its tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of companies written per UPDATE batch',
+        )
+
+    def handle(self, *args, **options):
+        updated = recalculate_esg_scores_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recalculated ESG scores for {updated} companies'))
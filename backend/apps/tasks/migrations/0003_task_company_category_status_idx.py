@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-16 18:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_company_filter_indexes'),
+        ('esg_assessment', '0001_initial'),
+        ('tasks', '0002_task_external_id_task_framework_tags_task_sector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['company', 'category', 'status'], name='task_co_cat_stat_idx'),
+        ),
+    ]
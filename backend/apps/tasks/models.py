@@ -163,6 +163,7 @@ class Task(models.Model):
             models.Index(fields=['company', 'status']),
             models.Index(fields=['assigned_to', 'status']),
             models.Index(fields=['category', 'priority']),
+            models.Index(fields=['company', 'category', 'status'], name='task_co_cat_stat_idx'),
         ]
     
     def __str__(self):
@@ -2,17 +2,74 @@
 Task generation utilities for ESG compliance
 V1-style markdown-driven task generation adapted for v3
 """
+from collections import defaultdict
 from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
 from django.utils import timezone
 from apps.tasks.models import Task
 from apps.companies.models import Company
 from .markdown_parser import ESGContentParser, parse_sector_questions
+import re
 import uuid
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 
+def _keyword_pattern(keywords):
+    """Compile plain substring keywords into one alternation, so text is scanned once"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+
+# Question category keywords, checked in this priority order
+_SOCIAL_KEYWORDS = _keyword_pattern([
+    # Food/health override environmental context
+    'cafeteria', 'food service', 'healthy food', 'locally sourced', 'nutrition',
+    'health', 'safety', 'employee', 'staff', 'training', 'community', 'social',
+    'welfare', 'student', 'curriculum', 'education', 'guest', 'customer',
+    'medical waste', 'hazardous', 'single-use plastics', 'paper use', 'digital'
+])
+_ENVIRONMENTAL_KEYWORDS = _keyword_pattern([
+    'electricity', 'water consumption', 'track consumption', 'utility bills',
+    'recycling', 'waste', 'air quality', 'monitor', 'environmental',
+    'resource', 'energy', 'consumption', 'emission', 'carbon', 'reuse'
+])
+_GOVERNANCE_KEYWORDS = _keyword_pattern([
+    'policy', 'strategy', 'sustainability plan', 'formal', 'written',
+    'governance', 'management', 'compliance', 'documentation', 'audit', 'reporting',
+    'designated person', 'team responsible', 'signed by senior', 'certification',
+    'assessment', 'impact assessment', 'contract', 'licensed company'
+])
+
+# Task priority keywords matched against a question's frameworks
+_HIGH_PRIORITY_KEYWORDS = _keyword_pattern([
+    # Mandatory frameworks
+    'mandatory', 'required', 'mandates', 'dst carbon calculator',
+    'al sa\'fat', 'estidama', 'federal law', 'climate law'
+])
+_MEDIUM_PRIORITY_KEYWORDS = _keyword_pattern([
+    # Training, monitoring, voluntary standards
+    'training', 'monitoring', 'tracking', 'reporting', 'voluntary',
+    'green key', 'leed', 'breeam'
+])
+
+# Keywords that indicate meter-related tasks - More specific to avoid false
+# positives. Matched literally, like the original substring checks.
+_METER_KEYWORDS = _keyword_pattern([
+    'electricity consumption', 'water consumption', 'energy consumption',
+    'monthly electricity', 'monthly water', 'monthly energy',
+    'utility bills', 'meter reading', 'kwh', 'm³', 'cubic meters',
+    'track.*consumption', 'monitor.*consumption', 'record.*consumption'
+])
+_UTILITY_PATTERNS = re.compile('|'.join([
+    'track.*utility', 'monitor.*utility', 'electricity.*track', 'water.*track',
+    'consumption.*month', 'monthly.*bill', 'utility.*meter'
+]))
+
+
 def generate_initial_tasks_for_company(company, created_by=None):
     """
     Generate initial ESG tasks for a company based on their business sector
@@ -22,6 +79,15 @@ def generate_initial_tasks_for_company(company, created_by=None):
     tasks directly from the structured questions, similar to v1 system.
     Includes specific meter information when available.
     """
+    with transaction.atomic():
+        # Lock the company row so two concurrent runs cannot both pass the
+        # existing-tasks check and insert a duplicate set
+        Company.objects.select_for_update().only('pk').get(pk=company.pk)
+        return _generate_initial_tasks(company, created_by)
+
+
+def _generate_initial_tasks(company, created_by):
+    """Check for existing tasks and create the initial set (caller holds the company lock)"""
     print("\n" + "="*80)
     print("🚀 [TASK GENERATION] V1-Style Markdown-Driven Task Generation")
     print("="*80)
@@ -95,25 +161,27 @@ def generate_initial_tasks_for_company(company, created_by=None):
                     question, meter_info
                 )
                 
-                # Create task
-                task = Task.objects.create(
-                    company=company,
-                    title=enhanced_title,
-                    description=enhanced_description,
-                    compliance_context=question.frameworks,
-                    action_required=enhanced_action,
-                    category=task_category,
-                    priority=_determine_task_priority(question),
-                    status='todo',
-                    due_date=due_date,
-                    created_by=created_by,
-                    assigned_to=created_by,  # Auto-assign to creator
-                    external_id=question.id,  # Store question ID for reference
-                    framework_tags=_extract_framework_tags(question.frameworks),
-                    sector=company.business_sector,
-                    task_type='esg_assessment',
-                    estimated_hours=_estimate_task_hours(question)
-                )
+                # Create task (in a savepoint, so one failed insert does not
+                # abort the surrounding transaction)
+                with transaction.atomic():
+                    task = Task.objects.create(
+                        company=company,
+                        title=enhanced_title,
+                        description=enhanced_description,
+                        compliance_context=question.frameworks,
+                        action_required=enhanced_action,
+                        category=task_category,
+                        priority=_determine_task_priority(question),
+                        status='todo',
+                        due_date=due_date,
+                        created_by=created_by,
+                        assigned_to=created_by,  # Auto-assign to creator
+                        external_id=question.id,  # Store question ID for reference
+                        framework_tags=_extract_framework_tags(question.frameworks),
+                        sector=company.business_sector,
+                        task_type='esg_assessment',
+                        estimated_hours=_estimate_task_hours(question)
+                    )
                 
                 tasks.append(task)
                 print(f"      ✅ Created task: {task.id}")
@@ -149,6 +217,42 @@ def generate_initial_tasks_for_company(company, created_by=None):
         return []
 
 
+def schedule_initial_task_generation(company, created_by=None):
+    """
+    Generate initial tasks for a company once the current transaction commits.
+    Runs inline by default; settings.TASK_GENERATION_ASYNC moves it to a
+    background thread so the onboarding request does not wait on it.
+    """
+    company_id = company.pk
+    created_by_id = created_by.pk if created_by else None
+    
+    def generate():
+        company = Company.objects.get(pk=company_id)
+        creator = None
+        if created_by_id:
+            from apps.authentication.models import User
+            creator = User.objects.filter(pk=created_by_id).first()
+        generated_tasks = generate_initial_tasks_for_company(company, created_by=creator)
+        logger.info(f"Generated {len(generated_tasks)} initial tasks for {company.name}")
+    
+    def generate_in_background():
+        try:
+            generate()
+        except Exception:
+            logger.exception(f"Background task generation failed for company {company_id}")
+        finally:
+            # The thread has its own database connection
+            connection.close()
+    
+    def start():
+        if getattr(settings, 'TASK_GENERATION_ASYNC', False):
+            threading.Thread(target=generate_in_background, daemon=True).start()
+        else:
+            generate()
+    
+    transaction.on_commit(start)
+
+
 def _calculate_due_date_for_question(question):
     """Calculate due date based on question priority and frameworks."""
     # Check if question is high priority (mandatory frameworks)
@@ -174,29 +278,15 @@ def _map_question_category(category, question_text=""):
     combined_text = f"{category} {question_text}".lower()
     
     # Priority 1: Social keywords (food/health override environmental context)
-    if any(keyword in combined_text for keyword in [
-        'cafeteria', 'food service', 'healthy food', 'locally sourced', 'nutrition',
-        'health', 'safety', 'employee', 'staff', 'training', 'community', 'social', 
-        'welfare', 'student', 'curriculum', 'education', 'guest', 'customer',
-        'medical waste', 'hazardous', 'single-use plastics', 'paper use', 'digital'
-    ]):
+    if _SOCIAL_KEYWORDS.search(combined_text):
         return 'social'
     
     # Priority 2: Environmental keywords
-    elif any(keyword in combined_text for keyword in [
-        'electricity', 'water consumption', 'track consumption', 'utility bills',
-        'recycling', 'waste', 'air quality', 'monitor', 'environmental',
-        'resource', 'energy', 'consumption', 'emission', 'carbon', 'reuse'
-    ]):
+    elif _ENVIRONMENTAL_KEYWORDS.search(combined_text):
         return 'environmental'
     
-    # Priority 3: Governance keywords  
-    elif any(keyword in combined_text for keyword in [
-        'policy', 'strategy', 'sustainability plan', 'formal', 'written',
-        'governance', 'management', 'compliance', 'documentation', 'audit', 'reporting',
-        'designated person', 'team responsible', 'signed by senior', 'certification',
-        'assessment', 'impact assessment', 'contract', 'licensed company'
-    ]):
+    # Priority 3: Governance keywords
+    elif _GOVERNANCE_KEYWORDS.search(combined_text):
         return 'governance'
     
     else:
@@ -206,23 +296,10 @@ def _map_question_category(category, question_text=""):
 def _determine_task_priority(question):
     """Determine task priority based on frameworks and question content."""
     frameworks_text = question.frameworks.lower()
-    question_text = question.wizard_question.lower()
     
-    # High priority: mandatory frameworks
-    high_priority_keywords = [
-        'mandatory', 'required', 'mandates', 'dst carbon calculator',
-        'al sa\'fat', 'estidama', 'federal law', 'climate law'
-    ]
-    
-    # Medium priority: training, monitoring, voluntary standards
-    medium_priority_keywords = [
-        'training', 'monitoring', 'tracking', 'reporting', 'voluntary',
-        'green key', 'leed', 'breeam'
-    ]
-    
-    if any(keyword in frameworks_text for keyword in high_priority_keywords):
+    if _HIGH_PRIORITY_KEYWORDS.search(frameworks_text):
         return 'high'
-    elif any(keyword in frameworks_text for keyword in medium_priority_keywords):
+    elif _MEDIUM_PRIORITY_KEYWORDS.search(frameworks_text):
         return 'medium'
     else:
         return 'low'
@@ -441,35 +518,16 @@ def _enhance_task_with_meter_info(question, meter_info):
     question_lower = original_title.lower()
     data_source_lower = original_action.lower() if original_action else ""
     
-    # Keywords that indicate meter-related tasks - More specific to avoid false positives
-    meter_keywords = [
-        'electricity consumption', 'water consumption', 'energy consumption',
-        'monthly electricity', 'monthly water', 'monthly energy',
-        'utility bills', 'meter reading', 'kwh', 'm³', 'cubic meters',
-        'track.*consumption', 'monitor.*consumption', 'record.*consumption'
-    ]
-    
     # More precise meter task detection to avoid adding meters to irrelevant tasks
-    is_meter_task = False
-    
     # Check for exact utility consumption patterns
-    for keyword in meter_keywords:
-        if keyword in question_lower or keyword in data_source_lower:
-            is_meter_task = True
-            break
+    is_meter_task = bool(
+        _METER_KEYWORDS.search(question_lower) or _METER_KEYWORDS.search(data_source_lower)
+    )
     
     # Additional check for specific utility-related questions
     if not is_meter_task and meter_info:
-        utility_patterns = [
-            'track.*utility', 'monitor.*utility', 'electricity.*track', 'water.*track',
-            'consumption.*month', 'monthly.*bill', 'utility.*meter'
-        ]
-        import re
         combined_text = f"{question_lower} {data_source_lower}"
-        for pattern in utility_patterns:
-            if re.search(pattern, combined_text):
-                is_meter_task = True
-                break
+        is_meter_task = bool(_UTILITY_PATTERNS.search(combined_text))
     
     if not is_meter_task or not meter_info:
         # Return original content if not meter-related or no meters available
@@ -660,32 +718,103 @@ def _get_governance_tasks(company, sector):
     ]
 
 
+ESG_CATEGORIES = ('environmental', 'social', 'governance')
+
+
+# Per-category task counts feeding _completion_score_updates
+_TASK_STAT_AGGREGATES = {
+    'total': Count('id'),
+    'done': Count('id', filter=Q(status='completed')),
+    'todo': Count('id', filter=Q(status='todo')),
+}
+
+
+def _completion_score_updates(stats, company):
+    """
+    Build the score column values for a company from its
+    {category: (total, completed, todo)} task counts
+    """
+    total_tasks = sum(total for total, _, _ in stats.values())
+    completed_tasks = sum(done for _, done, _ in stats.values())
+    updates = {
+        'data_completion_percentage': (completed_tasks / total_tasks) * 100,
+        'pending_tasks_count': sum(todo for _, _, todo in stats.values()),
+    }
+    
+    # Calculate category-specific scores
+    for category in ESG_CATEGORIES:
+        category_tasks, completed_category, _ = stats.get(category, (0, 0, 0))
+        if category_tasks > 0:
+            updates[f'{category}_score'] = (completed_category / category_tasks) * 100
+    
+    # Calculate overall ESG score
+    category_scores = [
+        updates.get(f'{category}_score', getattr(company, f'{category}_score')) or 0
+        for category in ESG_CATEGORIES
+    ]
+    updates['overall_esg_score'] = sum(category_scores) / 3
+    updates['updated_at'] = timezone.now()
+    return updates
+
+
 def _update_company_completion_stats(company):
     """Update company completion statistics based on current tasks"""
-    total_tasks = Task.objects.filter(company=company).count()
-    completed_tasks = Task.objects.filter(company=company, status='completed').count()
-    
-    if total_tasks > 0:
-        completion_percentage = (completed_tasks / total_tasks) * 100
-        company.data_completion_percentage = completion_percentage
-        
-        # Calculate category-specific scores
-        for category in ['environmental', 'social', 'governance']:
-            category_tasks = Task.objects.filter(company=company, category=category).count()
-            completed_category = Task.objects.filter(
-                company=company, 
-                category=category, 
-                status='completed'
-            ).count()
-            
-            if category_tasks > 0:
-                category_score = (completed_category / category_tasks) * 100
-                setattr(company, f'{category}_score', category_score)
-        
-        # Calculate overall ESG score
-        env_score = company.environmental_score or 0
-        social_score = company.social_score or 0  
-        gov_score = company.governance_score or 0
-        company.overall_esg_score = (env_score + social_score + gov_score) / 3
-        
-        company.save()
\ No newline at end of file
+    rows = (
+        Task.objects.filter(company=company)
+        .order_by()
+        .values('category')
+        .annotate(**_TASK_STAT_AGGREGATES)
+    )
+    stats = {row['category']: (row['total'], row['done'], row['todo']) for row in rows}
+    
+    if not stats:
+        # Still bump updated_at so cached dashboard aggregates are invalidated
+        company.updated_at = timezone.now()
+        company.pending_tasks_count = 0
+        Company.objects.filter(pk=company.pk).update(
+            updated_at=company.updated_at, pending_tasks_count=0
+        )
+        return
+    
+    updates = _completion_score_updates(stats, company)
+    
+    # One multi-column UPDATE instead of re-saving the whole company row
+    Company.objects.filter(pk=company.pk).update(**updates)
+    for field, value in updates.items():
+        setattr(company, field, value)
+
+
+def recalculate_esg_scores_all(batch_size=1000):
+    """
+    Recompute completion and ESG scores for every company with tasks using
+    one grouped aggregate across all companies and batched UPDATEs
+    """
+    rows = (
+        Task.objects.order_by()
+        .values('company_id', 'category')
+        .annotate(**_TASK_STAT_AGGREGATES)
+    )
+    stats_by_company = defaultdict(dict)
+    for row in rows:
+        stats_by_company[row['company_id']][row['category']] = (
+            row['total'], row['done'], row['todo']
+        )
+    
+    companies = list(
+        Company.objects.filter(pk__in=stats_by_company.keys())
+        .only('id', *(f'{category}_score' for category in ESG_CATEGORIES))
+    )
+    fields = set()
+    for company in companies:
+        updates = _completion_score_updates(stats_by_company[company.pk], company)
+        for field, value in updates.items():
+            setattr(company, field, value)
+        fields.update(updates)
+    
+    if companies:
+        Company.objects.bulk_update(companies, sorted(fields), batch_size=batch_size)
+    # Companies left without tasks are not in the aggregate above
+    Company.objects.filter(pending_tasks_count__gt=0, tasks__isnull=True).update(
+        pending_tasks_count=0
+    )
+    return len(companies)
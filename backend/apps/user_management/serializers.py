@@ -93,7 +93,7 @@ class CreateInvitationSerializer(serializers.ModelSerializer):
         company = self.context['request'].user.company
         
         # Check if user already exists in the company
-        if User.objects.filter(email=value, company=company).exists():
+        if User.objects.filter(email=value.lower(), company=company).exists():
             raise serializers.ValidationError(
                 "This email is already associated with a team member."
             )
@@ -308,16 +308,18 @@ def update_user_role(request):
 def user_permissions(request):
     """Get current user's permissions"""
     user = request.user
+    is_admin = user.role == 'admin'
+    is_manager = user.role in User.MANAGEMENT_ROLES
     
     permissions = {
-        'can_invite_users': user.role in ['admin', 'manager'],
-        'can_manage_roles': user.role == 'admin',
-        'can_view_reports': user.role in ['admin', 'manager', 'contributor'],
-        'can_manage_assessments': user.role in ['admin', 'manager'],
-        'can_export_data': user.role in ['admin', 'manager'],
-        'can_manage_settings': user.role == 'admin',
-        'can_delete_users': user.role == 'admin',
-        'can_assign_tasks': user.role in ['admin', 'manager'],
+        'can_invite_users': is_manager,
+        'can_manage_roles': is_admin,
+        'can_view_reports': user.role in User.REPORTING_ROLES,
+        'can_manage_assessments': is_manager,
+        'can_export_data': is_manager,
+        'can_manage_settings': is_admin,
+        'can_delete_users': is_admin,
+        'can_assign_tasks': is_manager,
     }
     
     serializer = UserPermissionsSerializer(permissions)